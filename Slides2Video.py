@@ -1,9 +1,46 @@
 # Import everything needed to edit video clips
 from moviepy.editor import *
 from moviepy.video.fx.resize import resize
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+from moviepy.audio.io.readers import FFMPEG_AudioReader
+from moviepy.config import get_setting
+from moviepy.tools import extensions_dict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import OrderedDict
+from collections.abc import Callable
+from tqdm import TMonitor
+from contextlib import contextmanager
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+import multiprocessing
+import numpy as np
+import subprocess
+import hashlib
+import shutil
+import tempfile
 import time
+import argparse
+import gc
+import re
+import sys
+import json
+import queue
+import threading
+import uuid
+import wave
+import os
 from timeit import default_timer as timer
 
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
 
 class Resolution:
     """
@@ -46,13 +83,95 @@ class Resolution:
         return Resolution.__height
 
 
+class RenderContext:
+    """
+    A class to carry the settings of one render: resolution, frame rate, color depth and cache handles.
+
+    Cards, slides and RenderClips given a context read it instead of the global Resolution,
+    so decks at different resolutions can be built and rendered side by side in one process.
+    """
+
+    def __init__(self, width: int, height: int, fps: int = 60, color_depth: int = 8, text_backend: str = None, segment_cache: "SegmentCache" = None):
+        if color_depth not in (8, 10):
+            raise ValueError(f"Unsupported color depth: {color_depth}")
+        if text_backend not in (None, "imagemagick", "pillow"):
+            raise ValueError(f"Unknown text backend: {text_backend}")
+
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.color_depth = color_depth
+        self.text_backend = text_backend
+        self.segment_cache = segment_cache
+
+    def __repr__(self) -> str:
+        return f"RenderContext({self.width}x{self.height}, {self.fps} fps, {self.color_depth}-bit)"
+
+    @staticmethod
+    def default() -> "RenderContext":
+        """
+        Get a context following the global Resolution and TextCache settings.
+
+        Returns:
+            RenderContext: Context with the current Resolution, 60 fps and 8-bit color.
+        """
+
+        return RenderContext(Resolution.width(), Resolution.height())
+
+    def size(self) -> tuple[int, int]:
+        """
+        Get the resolution.
+
+        Returns:
+            tuple[int, int]: Width and height of the video.
+        """
+
+        return self.width, self.height
+
+    def backend(self) -> str:
+        """
+        Get the text backend, falling back to the one TextCache is configured with.
+
+        Returns:
+            str: Name of the backend.
+        """
+
+        return self.text_backend or TextCache.backend()
+
+    def replace(self, **changes) -> "RenderContext":
+        """
+        Get a copy of the context with some settings changed, e.g. a 720p variant of a 1080p context.
+
+        Args:
+            **changes: Settings to change.
+
+        Returns:
+            RenderContext: New context.
+        """
+
+        settings = {key: getattr(self, key) for key in ("width", "height", "fps", "color_depth", "text_backend", "segment_cache")}
+        settings.update(changes)
+
+        return RenderContext(**settings)
+
+    def ffmpeg_params(self) -> list[str]:
+        """
+        Get the ffmpeg output parameters the color depth needs.
+
+        Returns:
+            list[str]: Parameters, empty for 8-bit color.
+        """
+
+        return ["-pix_fmt", "yuv420p10le"] if self.color_depth == 10 else []
+
+
 class Audio:
     """
     A class to manage audio in video clips.
     """
 
     def __init__(self):
-        self.__audio_clips = []
+        self.__audio_params = []
 
     def add_audio(self, audio_file_path: str, audio_start: int = 0, audio_end: int = 0, audio_volume: float = 1.0, play_audio_at: int = 0) -> None:
         """
@@ -66,16 +185,14 @@ class Audio:
             play_audio_at (int, optional): Play audio at given seconds.
         """
 
-        audio_clip = AudioFileClip(audio_file_path)
-        audio_clip = audio_clip.subclip(min(audio_clip.duration, audio_start), min(audio_clip.duration, audio_end))
-        audio_clip = audio_clip.fx(afx.volumex, audio_volume)
-        audio_clip = audio_clip.set_start(play_audio_at)
-        self.__audio_clips.append(audio_clip)
+        self.__audio_params.append((audio_file_path, audio_start, audio_end, audio_volume, play_audio_at))
 
     def _set_audio_clip(self, clip: VideoFileClip | CompositeVideoClip) -> VideoFileClip | CompositeVideoClip:
         """
         Set the audio clip for a video.
 
+        The audio regions are mixed by the AudioMixer only when the audio is played, so no audio file is opened here.
+
         Args:
             clip (VideoFileClip | CompositeVideoClip): Video clip to set audio to.
 
@@ -83,248 +200,3460 @@ class Audio:
             VideoFileClip | CompositeVideoClip: Video clip with audio added.
         """
 
-        if self.__audio_clips:
-            clip = clip.set_audio(CompositeAudioClip(self.__audio_clips))
-        
+        regions = self._audio_regions()
+        if regions:
+            clip = clip.set_audio(AudioMixer.clip(regions, clip.duration))
+
         return clip
 
+    def _audio_regions(self, source: str = None, duration: float = None) -> list[tuple]:
+        """
+        Describe the audio as regions of source files for the AudioMixer.
+
+        Args:
+            source (str, optional): Video whose own audio plays when no audio was added. Defaults to None.
+            duration (float, optional): Length of the video's own audio. Defaults to None.
 
-class TitleCard(Audio):
+        Returns:
+            list[tuple]: Path, start, end, volume and play time of each region.
+        """
+
+        if self.__audio_params:
+            return list(self.__audio_params)
+
+        return [(source, 0, duration, 1.0, 0)] if source else []
+
+
+class RenderProfiler:
     """
-    A class to create a title card for a video.
+    A class to measure where rendering time goes, per segment and stage.
     """
 
-    def __init__(self, bg_video_path: str, duration: int):
-        super().__init__()
+    __enabled = False
+    __lock = threading.Lock()
+    __local = threading.local()
+    __stages = {}
+    __frames = {}
+    __events = []
+    __origin = timer()
 
-        self.__bg_video_path = bg_video_path
-        self.__duration = duration
-        self.__text_clips = []
+    @staticmethod
+    def enable() -> None:
+        """
+        Start recording, dropping anything recorded before.
+        """
 
-    def add_text(self, text: str, postionY: int, font: str, font_size: int, color: str = "white", start: int = 1, fadein: int = 1) -> None:
+        RenderProfiler.reset()
+        RenderProfiler.__enabled = True
+
+    @staticmethod
+    def disable() -> None:
+        """
+        Stop recording.
         """
-        Add text to the title card.
 
-        Args:
-            text (str): Text content.
-            postionY (int): Y position of the text.
-            font (str): Font to use.
-            font_size (int): Font size.
-            color (str, optional): Text color. Defaults to "white".
-            start (int, optional): Start time for the text. Defaults to 1.
-            fadein (int, optional): Fade-in duration. Defaults to 1.
+        RenderProfiler.__enabled = False
+
+    @staticmethod
+    def enabled() -> bool:
         """
+        Check if the profiler is recording.
 
-        txt_overlay = TextClip(text, font= font, fontsize= font_size, color= color)
-        txt_overlay = txt_overlay.set_position(('center', postionY)).set_start(start).set_end(self.__duration).crossfadein(fadein)
+        Returns:
+            bool: True if recording.
+        """
 
-        self.__text_clips.append(txt_overlay)
+        return RenderProfiler.__enabled
 
-    def make_title_card(self) -> CompositeVideoClip:
+    @staticmethod
+    def reset() -> None:
         """
-        Create the title card as a CompositeVideoClip.
+        Drop everything recorded so far.
+        """
+
+        with RenderProfiler.__lock:
+            RenderProfiler.__stages = {}
+            RenderProfiler.__frames = {}
+            RenderProfiler.__events = []
+            RenderProfiler.__origin = timer()
+        RenderProfiler.__local.segment = None
+
+    @staticmethod
+    def set_segment(segment) -> None:
+        """
+        Set the segment the following stages and frames of the calling thread are recorded under.
+
+        Args:
+            segment: Label of the segment, None for the whole deck.
+        """
+
+        RenderProfiler.__local.segment = segment
+
+    @staticmethod
+    def segment():
+        """
+        Get the segment the stages and frames of the calling thread are recorded under.
 
         Returns:
-            CompositeVideoClip: Composite video clip for the title card.
+            Label of the segment, None for the whole deck.
         """
 
-        bg_clip = VideoFileClip(self.__bg_video_path).subclip(0, self.__duration)
-        bg_clip = self._set_audio_clip(bg_clip)
-        bg_clip = bg_clip.fx(vfx.resize, width= Resolution.width(), height= Resolution.height())
+        return getattr(RenderProfiler.__local, "segment", None)
 
-        return CompositeVideoClip([bg_clip] + self.__text_clips)
+    @staticmethod
+    @contextmanager
+    def stage(name: str):
+        """
+        Record the time spent in a stage. Time spent in nested stages is only counted for the innermost one.
 
+        Args:
+            name (str): Name of the stage.
+        """
 
-class Slide(Audio):
-    """
-    A class to create a slide in a video.
-    """
+        if not RenderProfiler.__enabled:
+            yield
+            return
+
+        stack = RenderProfiler.__local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = timer()
+        try:
+            yield
+        finally:
+            elapsed = timer() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            RenderProfiler.__record(name, RenderProfiler.segment(), start, elapsed, nested)
 
-    def __init__(self, image_path: str, slide_duration: int):
-        super().__init__()
+    @staticmethod
+    def __record(name: str, segment, start: float, elapsed: float, nested: float = 0.0) -> None:
+        """
+        Add a timed stage to the records.
 
-        self.__image_path = image_path
-        self.__slide_duration = slide_duration
-        self.__text_clips = []
+        Args:
+            name (str): Name of the stage.
+            segment: Label of the segment, None for the whole deck.
+            start (float): Time the stage started at.
+            elapsed (float): Seconds spent in the stage.
+            nested (float, optional): Seconds of it spent in nested stages. Defaults to 0.
+        """
 
-    def __create_text(self, text: str, font: str, font_size: int, text_bg_path: str, text_color: str, duration: int) -> CompositeVideoClip:
+        with RenderProfiler.__lock:
+            totals = RenderProfiler.__stages.setdefault((segment, name), [0.0, 0])
+            totals[0] += elapsed - nested
+            totals[1] += 1
+            RenderProfiler.__events.append({"name": name, "ph": "X", "ts": (start - RenderProfiler.__origin) * 1e6, "dur": elapsed * 1e6,
+                                            "pid": os.getpid(), "tid": threading.get_ident(), "args": {"segment": segment}})
+
+    @staticmethod
+    def profile_clip(clip: VideoClip, segment_starts: list[float] = None) -> VideoClip:
         """
-        Create a text overlay.
+        Wrap a clip so that building each of its frames is recorded.
 
         Args:
-            text (str): Text content.
-            font (str): Font to use.
-            font_size (int): Font size.
-            text_bg_path (str): Path to the text background.
-            text_color (str): Text color.
-            duration (int): Duration of the text overlay.
+            clip (VideoClip): Clip to profile.
+            segment_starts (list[float], optional): Start times of the segments of the clip. Defaults to None.
 
         Returns:
-            CompositeVideoClip: Composite video clip for the text overlay.
+            VideoClip: Profiled clip, or the clip itself if the profiler is disabled.
         """
-         
-        text_duration = self.__slide_duration * 0.45 if duration == -1 else duration
 
-        txt_clip = TextClip(text, font= font, fontsize= font_size, color= text_color)
-        txt_width, txt_height = txt_clip.size
+        if not RenderProfiler.__enabled:
+            return clip
 
-        txt_bg = ImageClip(text_bg_path)
-        txt_bg = resize(txt_bg, (txt_width * 1.4, txt_height * 1.4))
-        txt_bg = txt_bg.set_duration(text_duration)
+        RenderProfiler.instrument(clip)
 
-        txt_clip = txt_clip.set_position('center').set_start(1).set_end(text_duration).crossfadein(1)
+        def make_frame(get_frame, t):
+            RenderProfiler.__end_encode()
+            if segment_starts is not None:
+                RenderProfiler.set_segment(max(0, int(np.searchsorted(segment_starts, t, side= "right")) - 1))
 
-        return CompositeVideoClip([txt_bg, txt_clip])
-    
-    def add_text(self, text: str, postion: tuple[int, int], font: str, font_size: int, text_bg_path: str, text_color: str = "white", direction: str = "right", start: int = 0, text_duration: int = -1) -> None:
+            start = timer()
+            with RenderProfiler.stage("frame"):
+                frame = get_frame(t)
+            with RenderProfiler.__lock:
+                RenderProfiler.__frames.setdefault(RenderProfiler.segment(), []).append(timer() - start)
+
+            if hasattr(RenderProfiler.__local, "encode"):
+                RenderProfiler.__local.encode = (RenderProfiler.segment(), timer())
+
+            return frame
+
+        return clip.fl(make_frame, apply_to= [])
+
+    @staticmethod
+    def instrument(clip: VideoClip) -> None:
         """
-        Add text to the slide.
+        Record the video decoding and compositing of the moviepy clips a clip is made of, if the profiler is recording.
 
         Args:
-            text (str): Text content.
-            postion (tuple): Position coordinates (x, y) for the text.
-            font (str): Font to use.
-            font_size (int): Font size.
-            text_bg_path (str): Path to the text background.
-            text_color (str, optional): Text color. Defaults to "white".
-            direction (str, optional): Direction of text animation. Defaults to "right".
-            start (int, optional): Start time for the text. Defaults to 0.
-            text_duration (int, optional): Duration for the text. Defaults to -1.
+            clip (VideoClip): Clip to instrument, along with the clips it is made of.
         """
 
-        txt_overlay = self.__create_text(text, font, font_size, text_bg_path, text_color, text_duration)
-        txt_overlay_dim = txt_overlay.size
-        txt_overlay = txt_overlay.set_fps(60)
-        if direction == "left":
-            txt_overlay = txt_overlay.set_position(lambda t: (min(txt_overlay_dim[0] + postion[0], t * 1000) - txt_overlay_dim[0], Resolution.height() - (txt_overlay_dim[1] + postion[1])))
-        else:
-            txt_overlay = txt_overlay.set_position(lambda t: (Resolution.width() - min(txt_overlay_dim[0] + postion[0], t * 1000), Resolution.height() - (txt_overlay_dim[1] + postion[1])))
+        if not RenderProfiler.__enabled:
+            return
 
-        self.__text_clips.append(txt_overlay.set_start(start))
+        reader = getattr(clip, "reader", None)
+        if isinstance(reader, FFMPEG_VideoReader) and not getattr(reader, "profiled", False):
+            # Copies made by subclip and resize share the reader, so it is only wrapped once.
+            reader.get_frame = RenderProfiler.__timed("video_decode", reader.get_frame)
+            reader.profiled = True
+        if isinstance(clip, CompositeVideoClip) and not getattr(clip, "profiled", False):
+            clip.make_frame = RenderProfiler.__timed("composite", clip.make_frame)
+            clip.profiled = True
+
+        for child in [*getattr(clip, "clips", []), getattr(clip, "bg", None)]:
+            if child is not None and child is not clip:
+                RenderProfiler.instrument(child)
 
-    def make_slide(self) -> CompositeVideoClip:
+    @staticmethod
+    def __timed(name: str, func: Callable) -> Callable:
         """
-        Create the slide as a CompositeVideoClip.
+        Wrap a function so that its calls are recorded as a stage.
+
+        Args:
+            name (str): Name of the stage.
+            func (Callable): Function to wrap.
 
         Returns:
-            CompositeVideoClip: Composite video clip for the slide.
+            Callable: Wrapped function.
         """
 
-        img_clip = ImageClip(self.__image_path).set_duration(self.__slide_duration)
-        img_clip = self._set_audio_clip(img_clip)
-        img_clip = resize(img_clip, (Resolution.width(), Resolution.height()))
+        def wrapper(*args, **kwargs):
+            with RenderProfiler.stage(name):
+                return func(*args, **kwargs)
 
-        return CompositeVideoClip([img_clip] + self.__text_clips)
+        return wrapper
 
+    @staticmethod
+    @contextmanager
+    def moviepy_encode():
+        """
+        Record the time write_videofile spends handing the frames of a profiled clip to ffmpeg as the encode stage, if the profiler is recording.
 
-class EndCard(Audio):
-    """
-    A class to create an end card for a video.
-    """
+        moviepy's writer is left alone: the encode time is the gap between a frame being returned and the next one being
+        requested, measured on the calling thread only.
+        """
 
-    def __init__(self, end_video_path: str, duration: int):
-        super().__init__()
+        if not RenderProfiler.__enabled:
+            yield
+            return
 
-        self.__end_video_path = end_video_path
-        self.__duration = duration
-        self.__text_clips = []
+        RenderProfiler.__local.encode = None
+        try:
+            yield
+        finally:
+            RenderProfiler.__end_encode()
+            del RenderProfiler.__local.encode
 
-    def add_text(self, text: str, postionY: int, font: str, font_size: int, color: str = "white", start: int = 1, fadein: int = 1) -> None:
+    @staticmethod
+    def __end_encode() -> None:
         """
-        Add text to the end card.
-
-        Args:
-            text (str): Text content.
-            postionY (int): Y position of the text.
-            font (str): Font to use.
-            font_size (int): Font size.
-            color (str, optional): Text color. Defaults to "white".
-            start (int, optional): Start time for the text. Defaults to 1.
-            fadein (int, optional): Fade-in duration. Defaults to 1.
+        Record the encode stage running since the last frame of the calling thread was returned, if one is running.
         """
 
-        txt_overlay = TextClip(text, font= font, fontsize= font_size, color= color)
-        txt_overlay = txt_overlay.set_position(('center', postionY)).set_start(start).set_end(self.__duration).crossfadein(fadein)
+        pending = getattr(RenderProfiler.__local, "encode", None)
+        if pending is not None:
+            segment, start = pending
+            RenderProfiler.__record("encode", segment, start, timer() - start)
+            RenderProfiler.__local.encode = None
 
-        self.__text_clips.append(txt_overlay)
-    
-    def make_end_card(self) -> CompositeVideoClip:
+    @staticmethod
+    def __peak_memory() -> int | None:
         """
-        Create the end card as a CompositeVideoClip.
+        Get the peak resident memory of the process.
 
         Returns:
-            CompositeVideoClip: Composite video clip for the end card.
+            int | None: Peak memory in bytes, or None where it can't be measured.
         """
 
-        end_clip = VideoFileClip(self.__end_video_path).subclip(0, self.__duration)
-        end_clip = self._set_audio_clip(end_clip)
-        end_clip = end_clip.fx(vfx.resize, width= Resolution.width(), height= Resolution.height())
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
 
-        return CompositeVideoClip([end_clip] + self.__text_clips)
-    
+        return peak if sys.platform == "darwin" else peak * 1024
 
-class RenderClips(Audio):
-    """
-    A class to render video clips.
-    """
+    @staticmethod
+    def report() -> dict:
+        """
+        Summarize the recorded stages and frames.
 
-    def __init__(self, clips: list):
-        super().__init__()
+        Returns:
+            dict: Seconds and calls per stage, and frame count with p50/p95/max frame time in milliseconds, per segment.
+        """
 
-        self.__final_clip = concatenate_videoclips(clips)
-        self.__sub_clip = None
+        segments = {}
+        with RenderProfiler.__lock:
+            for (segment, name), (seconds, calls) in RenderProfiler.__stages.items():
+                label = "deck" if segment is None else str(segment)
+                segments.setdefault(label, {"stages": {}, "frames": None})["stages"][name] = {"seconds": seconds, "calls": calls}
+
+            for segment, times in RenderProfiler.__frames.items():
+                label = "deck" if segment is None else str(segment)
+                times = np.array(times) * 1000
+                segments.setdefault(label, {"stages": {}, "frames": None})["frames"] = {
+                    "count": len(times), "p50_ms": float(np.percentile(times, 50)), "p95_ms": float(np.percentile(times, 95)), "max_ms": float(times.max())}
+
+        return {"segments": segments, "peak_memory_bytes": RenderProfiler.__peak_memory()}
 
     @staticmethod
-    def __render_time(func):
+    def to_json(path: str) -> None:
         """
-        Decorator to measure rendering time.
+        Write the report as JSON.
 
         Args:
-            func (function): Function to be decorated.
+            path (str): Path of the JSON file.
+        """
 
-        Returns:
-            function: Decorated function.
+        with open(path, "w") as report_file:
+            json.dump(RenderProfiler.report(), report_file, indent= 2)
+
+    @staticmethod
+    def to_chrome_trace(path: str) -> None:
         """
+        Write the recorded stages as a Chrome trace, viewable in chrome://tracing or Perfetto.
 
-        def wrapper(*args, **kwargs):
-            start = timer()
-            result = func(*args, **kwargs)
-            end = timer()
-            print(f"Render copleted in: {int((end - start))} seconds")
+        Args:
+            path (str): Path of the trace file.
+        """
 
-            return result
-        
-        return wrapper
+        with RenderProfiler.__lock:
+            events = list(RenderProfiler.__events)
 
-    def sub_clip(self, start: int, end: int) -> None:
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+
+class TextCache:
+    """
+    A class to cache rasterized text overlays for the whole process.
+    """
+
+    __images = OrderedDict()
+    __size = 0
+    __max_size = 256 * 1024 ** 2
+    __disk_dir = None
+    __backend = "imagemagick"
+    __lock = threading.Lock()
+
+    @staticmethod
+    def configure(max_size: int = 256 * 1024 ** 2, disk_dir: str = None, backend: str = "imagemagick") -> None:
         """
-        Subset the final video clip based on the provided start and end times.
+        Configure the text cache.
 
         Args:
-            start (int): Start time for subsetting.
-            end (int): End time for subsetting.
+            max_size (int, optional): Memory in bytes above which the least recently used rasters are dropped. Defaults to 256 MiB.
+            disk_dir (str, optional): Directory to also keep the rasters in across processes. Defaults to None.
+            backend (str, optional): "imagemagick" to render with TextClip or "pillow" to render in process. Defaults to "imagemagick".
         """
 
-        duration = self.__final_clip.duration
-        self.__sub_clip = self.__final_clip.subclip(min(duration, start), min(duration, end))
+        if backend not in ("imagemagick", "pillow"):
+            raise ValueError(f"Unknown text backend: {backend}")
 
-    @__render_time
-    def render(self, output_filename: str = f"SE-{time.strftime('%#d-%#m-%Y')}", audio: bool = True, fps: int = 60, preset: str = "medium", codec: str = None, threads: int = 2) -> None:
+        with TextCache.__lock:
+            TextCache.__max_size = max_size
+            TextCache.__disk_dir = disk_dir
+            TextCache.__backend = backend
+            TextCache.__evict()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok= True)
+
+    @staticmethod
+    def backend() -> str:
         """
-        Render the video.
+        Get the text rendering backend.
 
-        Args:
-            output_filename (str, optional): Output filename. Defaults to "SE-{current date}".
-            audio (bool, optional): Include audio. Defaults to True.
-            fps (int, optional): Frames per second. Defaults to 60.
-            preset (str, optional): Encoding preset. Defaults to "medium".
-            codec (str, optional): Video codec. Defaults to None.
-            threads (int, optional): Number of threads for rendering. Defaults to 2.
+        Returns:
+            str: Name of the backend.
         """
 
-        if self.__sub_clip:
-            self.__sub_clip = self._set_audio_clip(self.__sub_clip)
-            self.__sub_clip.write_videofile(output_filename, audio= audio, fps= fps, preset= preset, codec= codec, threads= threads)
-        else:
-            self.__final_clip = self._set_audio_clip(self.__final_clip)
-            self.__final_clip.write_videofile(output_filename, audio= audio, fps= fps, preset= preset, codec= codec, threads= threads)
\ No newline at end of file
+        return TextCache.__backend
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Drop every raster held in memory.
+        """
+
+        with TextCache.__lock:
+            TextCache.__images.clear()
+            TextCache.__size = 0
+
+    @staticmethod
+    def __evict() -> None:
+        """
+        Drop the least recently used rasters until the cache fits in its maximum size.
+        """
+
+        while TextCache.__images and TextCache.__size > TextCache.__max_size:
+            _, (img, mask) = TextCache.__images.popitem(last= False)
+            TextCache.__size -= img.nbytes + mask.nbytes
+
+    @staticmethod
+    def __rasterize_imagemagick(text: str, font: str, font_size: int, color: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rasterize text with ImageMagick through TextClip.
+
+        Args:
+            text (str): Text content.
+            font (str): Font to use.
+            font_size (int): Font size.
+            color (str): Text color.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: RGB image and mask of the text.
+        """
+
+        txt_clip = TextClip(text, font= font, fontsize= font_size, color= color)
+
+        return txt_clip.img, txt_clip.mask.img.astype(np.float32)
+
+    @staticmethod
+    def __rasterize_pillow(text: str, font: str, font_size: int, color: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rasterize text in process with Pillow.
+
+        Args:
+            text (str): Text content.
+            font (str): Font name or path, looked up in the system font directories.
+            font_size (int): Font size.
+            color (str): Text color.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: RGB image and mask of the text.
+        """
+
+        try:
+            image_font = ImageFont.truetype(font, font_size)
+        except OSError as error:
+            # Pillow's default bitmap font ignores the font size, so a missing font would silently shrink the captions.
+            raise ValueError(f"Font {font} was not found in the system font directories.") from error
+
+        left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).multiline_textbbox((0, 0), text, font= image_font)
+        mask_image = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+        ImageDraw.Draw(mask_image).multiline_text((-left, -top), text, fill= 255, font= image_font)
+
+        mask = np.asarray(mask_image, dtype= np.float32) / 255
+        img = np.empty(mask.shape + (3,), dtype= np.uint8)
+        img[:] = ImageColor.getrgb(color)[:3]
+
+        return img, mask
+
+    @staticmethod
+    def raster(text: str, font: str, font_size: int, color: str = "white", backend: str = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the raster of a text, rasterizing it only if it isn't cached yet.
+
+        Args:
+            text (str): Text content.
+            font (str): Font to use.
+            font_size (int): Font size.
+            color (str, optional): Text color. Defaults to "white".
+            backend (str, optional): "imagemagick" or "pillow". Defaults to None, the configured backend.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Read-only RGB image and mask of the text.
+        """
+
+        backend = backend or TextCache.__backend
+        key = (text, font, font_size, color, backend)
+
+        with TextCache.__lock:
+            cached = TextCache.__images.get(key)
+            if cached:
+                TextCache.__images.move_to_end(key)
+
+        if cached is None:
+            disk_path = None
+            if TextCache.__disk_dir:
+                disk_path = os.path.join(TextCache.__disk_dir, hashlib.sha256(repr(key).encode()).hexdigest() + ".npz")
+
+            if disk_path and os.path.isfile(disk_path):
+                with np.load(disk_path) as arrays:
+                    cached = (arrays["img"], arrays["mask"])
+            else:
+                with RenderProfiler.stage("text"):
+                    if backend == "pillow":
+                        cached = TextCache.__rasterize_pillow(text, font, font_size, color)
+                    else:
+                        cached = TextCache.__rasterize_imagemagick(text, font, font_size, color)
+                if disk_path:
+                    # The raster gets its final name only once it is complete, so processes sharing the directory never load a partial file.
+                    handle, temp_path = tempfile.mkstemp(suffix= ".tmp", dir= TextCache.__disk_dir)
+                    with os.fdopen(handle, "wb") as temp_file:
+                        np.savez(temp_file, img= cached[0], mask= cached[1])
+                    os.replace(temp_path, disk_path)
+
+            for array in cached:
+                array.setflags(write= False)
+
+            with TextCache.__lock:
+                if key not in TextCache.__images:
+                    TextCache.__images[key] = cached
+                    TextCache.__size += cached[0].nbytes + cached[1].nbytes
+                    TextCache.__evict()
+
+        return cached
+
+    @staticmethod
+    def text_clip(text: str, font: str, font_size: int, color: str = "white", backend: str = None) -> ImageClip:
+        """
+        Get a text clip, rasterizing the text only if it isn't cached yet.
+
+        Args:
+            text (str): Text content.
+            font (str): Font to use.
+            font_size (int): Font size.
+            color (str, optional): Text color. Defaults to "white".
+            backend (str, optional): "imagemagick" or "pillow". Defaults to None, the configured backend.
+
+        Returns:
+            ImageClip: Text clip with its mask.
+        """
+
+        img, mask = TextCache.raster(text, font, font_size, color, backend)
+
+        return ImageClip(img).set_mask(ImageClip(mask, ismask= True))
+
+
+class AssetCache:
+    """
+    A class to share decoded and resized images across slides.
+    """
+
+    __images = OrderedDict()
+    __size = 0
+    __max_size = 512 * 1024 ** 2
+    __lock = threading.Lock()
+
+    @staticmethod
+    def configure(max_size: int = 512 * 1024 ** 2) -> None:
+        """
+        Configure the asset cache.
+
+        Args:
+            max_size (int, optional): Memory in bytes above which the least recently used images are dropped. Defaults to 512 MiB.
+        """
+
+        with AssetCache.__lock:
+            AssetCache.__max_size = max_size
+            AssetCache.__evict()
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Drop every image held in memory.
+        """
+
+        with AssetCache.__lock:
+            AssetCache.__images.clear()
+            AssetCache.__size = 0
+
+    @staticmethod
+    def __evict() -> None:
+        """
+        Drop the least recently used images until the cache fits in its maximum size.
+        """
+
+        while AssetCache.__images and AssetCache.__size > AssetCache.__max_size:
+            _, img = AssetCache.__images.popitem(last= False)
+            AssetCache.__size -= img.nbytes
+
+    @staticmethod
+    def image(path: str, size: tuple[int, int] = None) -> np.ndarray:
+        """
+        Get a decoded image, decoding and resizing it only if it isn't cached yet.
+
+        Args:
+            path (str): Path to the image.
+            size (tuple, optional): Width and height to resize the image to. Defaults to None, the original size.
+
+        Returns:
+            np.ndarray: Read-only RGB or RGBA image.
+        """
+
+        size = (int(size[0]), int(size[1])) if size else None
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns, size)
+
+        with AssetCache.__lock:
+            img = AssetCache.__images.get(key)
+            if img is not None:
+                AssetCache.__images.move_to_end(key)
+                return img
+
+        with Image.open(path) as pil_image:
+            with RenderProfiler.stage("image_decode"):
+                has_alpha = "A" in pil_image.getbands() or "transparency" in pil_image.info
+                pil_image = pil_image.convert("RGBA" if has_alpha else "RGB")
+            if size and size != pil_image.size:
+                with RenderProfiler.stage("resize"):
+                    pil_image = pil_image.resize(size, Image.LANCZOS)
+            img = np.asarray(pil_image)
+        img.setflags(write= False)
+
+        with AssetCache.__lock:
+            if key not in AssetCache.__images:
+                AssetCache.__images[key] = img
+                AssetCache.__size += img.nbytes
+                AssetCache.__evict()
+
+        return img
+
+
+class AudioMixer:
+    """
+    A class to decode audio files once and mix regions of them into a single track with NumPy.
+    """
+
+    __fps = 44100
+    # Samples mixed and written at a time, ten seconds at 44.1 kHz.
+    __block_size = 441000
+    __tracks = OrderedDict()
+    __size = 0
+    __max_size = 512 * 1024 ** 2
+    __lock = threading.Lock()
+
+    @staticmethod
+    def configure(max_size: int = 512 * 1024 ** 2) -> None:
+        """
+        Configure the decoded audio cache.
+
+        Args:
+            max_size (int, optional): Memory in bytes above which the least recently used tracks are dropped. Defaults to 512 MiB.
+        """
+
+        with AudioMixer.__lock:
+            AudioMixer.__max_size = max_size
+            AudioMixer.__evict()
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Drop every decoded track held in memory.
+        """
+
+        with AudioMixer.__lock:
+            AudioMixer.__tracks.clear()
+            AudioMixer.__size = 0
+
+    @staticmethod
+    def __evict() -> None:
+        """
+        Drop the least recently used tracks until the cache fits in its maximum size.
+        """
+
+        while AudioMixer.__tracks and AudioMixer.__size > AudioMixer.__max_size:
+            _, samples = AudioMixer.__tracks.popitem(last= False)
+            AudioMixer.__size -= samples.nbytes
+
+    @staticmethod
+    def pcm(path: str) -> np.ndarray:
+        """
+        Get the decoded stereo samples of a file, decoding it only if it isn't cached yet.
+
+        Args:
+            path (str): Path to an audio or video file.
+
+        Returns:
+            np.ndarray: Read-only float32 samples of shape (n, 2) at 44100 Hz, empty if the file has no audio.
+        """
+
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+        with AudioMixer.__lock:
+            samples = AudioMixer.__tracks.get(key)
+            if samples is not None:
+                AudioMixer.__tracks.move_to_end(key)
+                return samples
+
+        with RenderProfiler.stage("audio"):
+            decoded = subprocess.run([get_setting("FFMPEG_BINARY"), "-loglevel", "error", "-i", path, "-vn", "-f", "f32le", "-ac", "2", "-ar", str(AudioMixer.__fps), "-"],
+                                     stdout= subprocess.PIPE, stderr= subprocess.PIPE)
+        if decoded.returncode != 0:
+            stderr = decoded.stderr.decode(errors= "replace")
+            # Without an audio stream ffmpeg has nothing to write, which only means the file is silent.
+            if "does not contain any stream" not in stderr:
+                raise IOError(f"ffmpeg failed to decode the audio of {path}:\n{stderr}")
+        samples = np.frombuffer(decoded.stdout[:len(decoded.stdout) // 8 * 8], dtype= np.float32).reshape(-1, 2)
+
+        with AudioMixer.__lock:
+            if key not in AudioMixer.__tracks:
+                AudioMixer.__tracks[key] = samples
+                AudioMixer.__size += samples.nbytes
+                AudioMixer.__evict()
+
+        return samples
+
+    @staticmethod
+    def has_audio(regions: list[tuple]) -> bool:
+        """
+        Check whether any of the files of the regions has audio, decoding them into the cache.
+
+        Args:
+            regions (list[tuple]): Regions to mix.
+
+        Returns:
+            bool: True if at least one of the files has audio.
+        """
+
+        return any(len(AudioMixer.pcm(path)) for path, *_ in regions)
+
+    @staticmethod
+    def mix(regions: list[tuple], duration: float, start: float = 0) -> np.ndarray | None:
+        """
+        Mix regions of audio files into a block of a single track.
+
+        Each region is a path, start and end in the file, volume and play time on the track, and optionally the
+        longest it may play. Like add_audio, start and end are clamped to the length of the file and an end
+        before the start plays nothing. Mixing a track block by block gives the same samples as mixing it at once.
+
+        Args:
+            regions (list[tuple]): Regions to mix.
+            duration (float): Length of the block.
+            start (float, optional): Start time of the block on the track. Defaults to 0.
+
+        Returns:
+            np.ndarray | None: float32 samples of shape (n, 2), or None if none of the files have audio.
+        """
+
+        fps = AudioMixer.__fps
+        block_start = int(round(start * fps))
+        block = np.zeros((int(round(duration * fps)), 2), dtype= np.float32)
+        has_audio = False
+
+        for path, audio_start, audio_end, volume, play_audio_at, *limit in regions:
+            samples = AudioMixer.pcm(path)
+            if not len(samples):
+                continue
+            has_audio = True
+
+            first = min(len(samples), int(round(audio_start * fps)))
+            count = min(len(samples), int(round(audio_end * fps))) - first
+            if limit and limit[0] is not None:
+                count = min(count, int(round(limit[0] * fps)))
+            offset = int(round(play_audio_at * fps)) - block_start
+            if offset < 0:
+                first, count, offset = first - offset, count + offset, 0
+            count = min(count, len(block) - offset)
+            if count > 0:
+                with RenderProfiler.stage("audio"):
+                    block[offset:offset + count] += samples[first:first + count] * np.float32(volume)
+
+        return block if has_audio else None
+
+    @staticmethod
+    def clip(regions: list[tuple], duration: float) -> AudioClip:
+        """
+        Make an audio clip that mixes regions only for the samples that are read, so it holds no track of its own.
+
+        Nothing is decoded until the clip is read, and it is silent if none of the files have audio.
+
+        Args:
+            regions (list[tuple]): Regions to mix.
+            duration (float): Length of the clip.
+
+        Returns:
+            AudioClip: Stereo clip at 44100 Hz.
+        """
+
+        fps = AudioMixer.__fps
+
+        def make_frame(t):
+            indices = np.round(np.atleast_1d(t) * fps).astype(np.int64)
+            first = int(indices.min())
+            count = int(indices.max()) + 1 - first
+            block = AudioMixer.mix(regions, count / fps, first / fps)
+            if block is None:
+                block = np.zeros((count, 2), dtype= np.float32)
+            frames = block[indices - first]
+
+            return frames if np.ndim(t) else frames[0]
+
+        return AudioClip(make_frame, duration= duration, fps= fps)
+
+    @staticmethod
+    def write_wav(audio_clip: AudioClip, path: str) -> None:
+        """
+        Write an audio clip as a 16-bit stereo WAV file, one block of samples at a time.
+
+        Args:
+            audio_clip (AudioClip): Audio to write.
+            path (str): Path of the WAV file.
+        """
+
+        fps = AudioMixer.__fps
+        total = int(round(audio_clip.duration * fps))
+
+        with RenderProfiler.stage("audio"), wave.open(path, "wb") as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(fps)
+            for first in range(0, total, AudioMixer.__block_size):
+                samples = np.asarray(audio_clip.get_frame(np.arange(first, min(total, first + AudioMixer.__block_size)) / fps), dtype= np.float32)
+                if samples.ndim == 1 or samples.shape[1] == 1:
+                    samples = np.repeat(samples.reshape(-1, 1), 2, axis= 1)
+                wav_file.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+class Motion:
+    """
+    A class to describe the motion and opacity of a layer as eased keyframes, evaluated in closed form or baked into per-frame tables.
+    """
+
+    __easings = {
+        "linear": lambda progress: progress,
+        "ease_in": lambda progress: progress ** 2,
+        "ease_out": lambda progress: 1 - (1 - progress) ** 2,
+        "ease_in_out": lambda progress: progress ** 2 * (3 - 2 * progress),
+    }
+
+    def __init__(self, keyframes: list[tuple], easing: str = "linear"):
+        if easing not in Motion.__easings:
+            raise ValueError(f"Unknown easing: {easing}")
+        if not keyframes:
+            raise ValueError("A motion needs at least one keyframe.")
+
+        self.__keyframes = tuple(sorted((float(t), float(x), float(y), float(opacity[0]) if opacity else 1.0) for t, x, y, *opacity in keyframes))
+        self.__easing = easing
+        self.__times = np.array([keyframe[0] for keyframe in self.__keyframes])
+        self.__values = np.array([keyframe[1:] for keyframe in self.__keyframes])
+
+    def __repr__(self) -> str:
+        return f"Motion({list(self.__keyframes)!r}, {self.__easing!r})"
+
+    @staticmethod
+    def easings() -> list[str]:
+        """
+        Get the names of the easing curves.
+
+        Returns:
+            list[str]: Easing names.
+        """
+
+        return list(Motion.__easings)
+
+    @staticmethod
+    def slide_in(direction: str, size: tuple[int, int], postion: tuple[int, int], speed: float = 1000, easing: str = "linear", frame_size: tuple[int, int] = None) -> "Motion":
+        """
+        Describe a caption sliding in from the left or right edge of the video and stopping at its position.
+
+        Args:
+            direction (str): "left" to enter from the left edge, anything else to enter from the right edge.
+            size (tuple): Width and height of the caption.
+            postion (tuple): Distance (x, y) of the caption from the edge it enters from and from the bottom of the video.
+            speed (float, optional): Pixels per second, for the linear motion. Defaults to 1000.
+            easing (str, optional): Easing curve of the motion. Defaults to "linear".
+            frame_size (tuple, optional): Width and height of the video. Defaults to None, the global Resolution.
+
+        Returns:
+            Motion: Motion of the top left corner of the caption.
+        """
+
+        width, height = size
+        frame_width, frame_height = frame_size or (Resolution.width(), Resolution.height())
+        distance = width + postion[0]
+        y = frame_height - (height + postion[1])
+        if direction == "left":
+            return Motion([(0, -width, y), (distance / speed, postion[0], y)], easing)
+
+        return Motion([(0, frame_width, y), (distance / speed, frame_width - distance, y)], easing)
+
+    def shifted(self, dx: float = 0, dy: float = 0, dt: float = 0) -> "Motion":
+        """
+        Get the same motion moved in space and time.
+
+        Args:
+            dx (float, optional): Horizontal offset. Defaults to 0.
+            dy (float, optional): Vertical offset. Defaults to 0.
+            dt (float, optional): Delay of the keyframes, negative to start further into the motion. Defaults to 0.
+
+        Returns:
+            Motion: Moved motion.
+        """
+
+        return Motion([(t + dt, x + dx, y + dy, opacity) for t, x, y, opacity in self.__keyframes], self.__easing)
+
+    def at(self, t) -> np.ndarray:
+        """
+        Evaluate the motion, holding the first and last keyframes outside of their range.
+
+        Args:
+            t: Time or array of times relative to the start of the layer.
+
+        Returns:
+            np.ndarray: x, y and opacity (0 to 1) along the last axis.
+        """
+
+        times = np.atleast_1d(np.asarray(t, dtype= np.float64))
+        if len(self.__times) == 1:
+            values = np.broadcast_to(self.__values[0], (len(times), 3))
+        else:
+            index = np.clip(np.searchsorted(self.__times, times, side= "right") - 1, 0, len(self.__times) - 2)
+            span = self.__times[index + 1] - self.__times[index]
+            progress = np.clip((times - self.__times[index]) / np.where(span > 0, span, 1), 0, 1)
+            eased = Motion.__easings[self.__easing](progress)[:, None]
+            values = self.__values[index] + (self.__values[index + 1] - self.__values[index]) * eased
+
+        return values if np.ndim(t) else values[0]
+
+    def is_opaque(self) -> bool:
+        """
+        Check whether the opacity stays at 1 throughout the motion.
+
+        Returns:
+            bool: True if the layer is never faded by the motion.
+        """
+
+        return bool(np.all(self.__values[:, 2] == 1))
+
+    def position(self, t: float) -> tuple[int, int]:
+        """
+        Get the pixel position at a time, rounded down.
+
+        Args:
+            t (float): Time relative to the start of the layer.
+
+        Returns:
+            tuple[int, int]: x and y position.
+        """
+
+        x, y, _ = np.floor(self.at(t))
+
+        return int(x), int(y)
+
+    def bake(self, duration: float, fps: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the motion once per frame.
+
+        Args:
+            duration (float): Length of the layer.
+            fps (int): Frames per second.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: int32 positions of shape (n, 2) and uint16 opacity levels (0 to 255) of shape (n,).
+        """
+
+        values = self.at(np.arange(int(round(duration * fps)) + 1) / fps)
+
+        return np.floor(values[:, :2]).astype(np.int32), np.round(np.clip(values[:, 2], 0, 1) * 255).astype(np.uint16)
+
+
+class Layer:
+    """
+    A class to describe an image drawn by the LayerCompositor.
+    """
+
+    def __init__(self, img: np.ndarray, alpha: np.ndarray | None, start: float, end: float, position: tuple | Callable | Motion, fadein: float = 0, fps: int = 60):
+        self.start = start
+        self.end = end
+
+        height, width = img.shape[:2]
+        self.__img = img[:, :, :3]
+        self.__alpha = None if alpha is None else alpha.astype(np.uint16).reshape(height, width, 1)
+        self.__inverse = np.empty((height, width, 1), dtype= np.uint16)
+        self.__faded = np.empty((height, width, 1), dtype= np.uint16)
+        self.__blend = np.empty((height, width, 3), dtype= np.uint16)
+        self.__scratch = np.empty((height, width, 3), dtype= np.uint16)
+
+        # Position and opacity are looked up per frame from tables baked at the output frame rate.
+        if not isinstance(position, Motion):
+            times = start + np.arange(int(round((end - start) * fps)) + 1) / fps
+            position = Motion([(t - start, *position(t)) for t in times] if callable(position) else [(0, *position)])
+        self.__fps = fps
+        self.__positions, self.__levels = position.bake(end - start, fps)
+
+        fade_frames = int(round(fadein * fps))
+        if fade_frames:
+            fade_ramp = np.round(255 * np.arange(fade_frames) / fade_frames).astype(np.uint16)[:len(self.__levels)]
+            self.__levels[:len(fade_ramp)] = (self.__levels[:len(fade_ramp)] * fade_ramp + 127) // 255
+
+    def is_playing(self, t: float) -> bool:
+        """
+        Check if the layer is visible at the given time.
+
+        Args:
+            t (float): Time of the frame.
+
+        Returns:
+            bool: True if the layer is visible.
+        """
+
+        return self.start <= t < self.end
+
+    def state(self, t: float) -> tuple[int, int, int] | None:
+        """
+        Get what the layer looks like at the given time. Frames where every layer is in the same state are identical.
+
+        Args:
+            t (float): Time of the frame.
+
+        Returns:
+            tuple[int, int, int] | None: Position and opacity level (0 to 255), or None if nothing is drawn.
+        """
+
+        if not self.is_playing(t):
+            return None
+
+        index = min(max(int(round((t - self.start) * self.__fps)), 0), len(self.__levels) - 1)
+        level = int(self.__levels[index])
+
+        return (int(self.__positions[index][0]), int(self.__positions[index][1]), level) if level else None
+
+    def bounds(self, state: tuple[int, int, int] | None) -> tuple[int, int, int, int] | None:
+        """
+        Get the rectangle a state of the layer covers.
+
+        Args:
+            state (tuple | None): State of the layer.
+
+        Returns:
+            tuple[int, int, int, int] | None: Left, top, right and bottom edges, or None if nothing is drawn.
+        """
+
+        if state is None:
+            return None
+        height, width = self.__img.shape[:2]
+
+        return state[0], state[1], state[0] + width, state[1] + height
+
+    def draw(self, frame: np.ndarray, t: float, rect: tuple[int, int, int, int] = None) -> None:
+        """
+        Blend the layer into the frame in place.
+
+        Args:
+            frame (np.ndarray): RGB frame to draw on.
+            t (float): Time of the frame.
+            rect (tuple, optional): Left, top, right and bottom edges of the part of the frame to draw on. Defaults to None, the whole frame.
+        """
+
+        state = self.state(t)
+        if state is None:
+            return
+        x, y, level = state
+
+        frame_height, frame_width = frame.shape[:2]
+        left, top, right, bottom = rect or (0, 0, frame_width, frame_height)
+        height, width = self.__img.shape[:2]
+        x1, y1 = max(0, -x, left - x), max(0, -y, top - y)
+        x2, y2 = min(width, frame_width - x, right - x), min(height, frame_height - y, bottom - y)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        region = frame[y + y1:y + y2, x + x1:x + x2]
+        img = self.__img[y1:y2, x1:x2]
+
+        if self.__alpha is None and level == 255:
+            np.copyto(region, img)
+            return
+
+        alpha = self.__faded[y1:y2, x1:x2]
+        if self.__alpha is None:
+            alpha.fill(level)
+        elif level == 255:
+            np.copyto(alpha, self.__alpha[y1:y2, x1:x2])
+        else:
+            np.multiply(self.__alpha[y1:y2, x1:x2], level, out= alpha)
+            np.add(alpha, 127, out= alpha)
+            np.floor_divide(alpha, 255, out= alpha)
+
+        # region = (img * alpha + region * (255 - alpha)) / 255, rounded, on preallocated uint16 buffers.
+        blend = self.__blend[y1:y2, x1:x2]
+        scratch = self.__scratch[y1:y2, x1:x2]
+        inverse = self.__inverse[y1:y2, x1:x2]
+        np.subtract(255, alpha, out= inverse)
+        np.multiply(img, alpha, out= blend)
+        np.multiply(region, inverse, out= scratch)
+        np.add(blend, scratch, out= blend)
+        np.add(blend, 128, out= blend)
+        np.right_shift(blend, 8, out= scratch)
+        np.add(blend, scratch, out= blend)
+        np.right_shift(blend, 8, out= blend)
+        np.copyto(region, blend, casting= "unsafe")
+
+
+class LayerCompositor(VideoClip):
+    """
+    A class to composite a background and image layers into preallocated frame buffers.
+
+    On a still background, a frame where no layer changed is the previous frame itself, and
+    otherwise only the rectangle covering the changed layers is composited again.
+    """
+
+    def __init__(self, background: np.ndarray | VideoClip, layers: list[Layer], duration: float):
+        self.__background = background
+        self.__layers = layers
+
+        height, width = background.shape[:2] if isinstance(background, np.ndarray) else background.size[::-1]
+        # Frames are handed out from a ring of buffers so a frame stays valid while the next ones are composited.
+        self.__buffers = [np.empty((height, width, 3), dtype= np.uint8) for _ in range(3)]
+        # Layer states each buffer was composited with, None when unknown.
+        self.__states = [None] * len(self.__buffers)
+        self.__buffer_index = 0
+
+        super().__init__(make_frame= self.__make_frame, duration= duration)
+        if not isinstance(background, np.ndarray):
+            self.audio = background.audio
+
+    def __dirty_rect(self, old_states: tuple, new_states: tuple) -> tuple[int, int, int, int] | None:
+        """
+        Get the rectangle covering every layer that differs between two sets of layer states.
+
+        Args:
+            old_states (tuple): Layer states the buffer was composited with.
+            new_states (tuple): Layer states of the new frame.
+
+        Returns:
+            tuple[int, int, int, int] | None: Left, top, right and bottom edges within the frame, or None if nothing differs.
+        """
+
+        rects = [rect for layer, old, new in zip(self.__layers, old_states, new_states) if old != new
+                 for rect in (layer.bounds(old), layer.bounds(new)) if rect is not None]
+        if not rects:
+            return None
+
+        height, width = self.__buffers[0].shape[:2]
+        left, top = max(0, min(rect[0] for rect in rects)), max(0, min(rect[1] for rect in rects))
+        right, bottom = min(width, max(rect[2] for rect in rects)), min(height, max(rect[3] for rect in rects))
+
+        return (left, top, right, bottom) if left < right and top < bottom else None
+
+    def __make_frame(self, t: float) -> np.ndarray:
+        """
+        Build the frame at the given time.
+
+        Args:
+            t (float): Time of the frame.
+
+        Returns:
+            np.ndarray: Frame at time t.
+        """
+
+        if not isinstance(self.__background, np.ndarray):
+            self.__buffer_index = (self.__buffer_index + 1) % len(self.__buffers)
+            frame = self.__buffers[self.__buffer_index]
+            with RenderProfiler.stage("video_decode"):
+                np.copyto(frame, self.__background.get_frame(t), casting= "unsafe")
+            with RenderProfiler.stage("composite"):
+                for layer in self.__layers:
+                    if layer.is_playing(t):
+                        layer.draw(frame, t)
+            return frame
+
+        states = tuple(layer.state(t) for layer in self.__layers)
+        if states == self.__states[self.__buffer_index]:
+            return self.__buffers[self.__buffer_index]
+
+        self.__buffer_index = (self.__buffer_index + 1) % len(self.__buffers)
+        frame = self.__buffers[self.__buffer_index]
+        old_states = self.__states[self.__buffer_index]
+        self.__states[self.__buffer_index] = None
+
+        with RenderProfiler.stage("composite"):
+            if old_states is None:
+                rect = (0, 0, frame.shape[1], frame.shape[0])
+                np.copyto(frame, self.__background[:, :, :3])
+            else:
+                # The buffer still holds an older frame, so only what changed since then is redrawn.
+                rect = self.__dirty_rect(old_states, states)
+                if rect is not None:
+                    left, top, right, bottom = rect
+                    np.copyto(frame[top:bottom, left:right], self.__background[top:bottom, left:right, :3])
+            if rect is not None:
+                for layer in self.__layers:
+                    layer.draw(frame, t, rect)
+
+        self.__states[self.__buffer_index] = states
+
+        return frame
+
+
+class TitleCard(Audio):
+    """
+    A class to create a title card for a video.
+    """
+
+    def __init__(self, bg_video_path: str, duration: int, context: RenderContext = None):
+        super().__init__()
+
+        self.__bg_video_path = bg_video_path
+        self.__duration = duration
+        self.__context = context
+        self.__text_clips = []
+        self.__text_params = []
+
+    def add_text(self, text: str, postionY: int, font: str, font_size: int, color: str = "white", start: int = 1, fadein: int = 1) -> None:
+        """
+        Add text to the title card.
+
+        Args:
+            text (str): Text content.
+            postionY (int): Y position of the text.
+            font (str): Font to use.
+            font_size (int): Font size.
+            color (str, optional): Text color. Defaults to "white".
+            start (int, optional): Start time for the text. Defaults to 1.
+            fadein (int, optional): Fade-in duration. Defaults to 1.
+        """
+
+        txt_overlay = TextCache.text_clip(text, font, font_size, color, (self.__context or RenderContext.default()).backend())
+        txt_overlay = txt_overlay.set_position(('center', postionY)).set_start(start).set_end(self.__duration).crossfadein(fadein)
+
+        self.__text_clips.append(txt_overlay)
+        self.__text_params.append((text, postionY, font, font_size, color, start, fadein))
+
+    def duration(self) -> int:
+        """
+        Get the duration of the title card.
+
+        Returns:
+            int: Duration in seconds.
+        """
+
+        return self.__duration
+
+    def _fingerprint(self, mode: str = "moviepy") -> str:
+        """
+        Get the hash of everything that affects the frames of the title card.
+
+        Args:
+            mode (str, optional): How the title card is composited: "moviepy" or "compositor". Defaults to "moviepy".
+
+        Returns:
+            str: Fingerprint of the title card.
+        """
+
+        context = self.__context or RenderContext.default()
+
+        return SegmentCache.fingerprint("title_card", self.__bg_video_path, self.__duration, self.__text_params, context.backend(), context.width, context.height, mode)
+
+    def _audio_regions(self) -> list[tuple]:
+        """
+        Describe the audio of the title card as regions for the AudioMixer, the video's own audio if none was added.
+
+        Returns:
+            list[tuple]: Path, start, end, volume and play time of each region.
+        """
+
+        return super()._audio_regions(self.__bg_video_path, self.__duration)
+
+    def _stream_copy_span(self) -> tuple[str, float]:
+        """
+        Get the span at the start of the title card that has no text on it.
+
+        Returns:
+            tuple[str, float]: Path of the video and the end of the span in seconds.
+        """
+
+        return self.__bg_video_path, min([params[5] for params in self.__text_params] + [self.__duration])
+
+    def __text_layers(self, fps: int) -> list[Layer]:
+        """
+        Describe the text of the title card as compositor layers.
+
+        Args:
+            fps (int): Frame rate the fades are baked at.
+
+        Returns:
+            list[Layer]: Layers of the text.
+        """
+
+        context = self.__context or RenderContext.default()
+        layers = []
+        for text, postionY, font, font_size, color, start, fadein in self.__text_params:
+            img, mask = TextCache.raster(text, font, font_size, color, context.backend())
+            position = ((context.width - img.shape[1]) / 2, postionY)
+            layers.append(Layer(img, np.round(mask * 255), start, self.__duration, position, fadein, fps))
+
+        return layers
+
+    def make_title_card(self, compositor: bool = False, fps: int = None) -> CompositeVideoClip | LayerCompositor:
+        """
+        Create the title card as a CompositeVideoClip.
+
+        Args:
+            compositor (bool, optional): Composite the text with the LayerCompositor instead of moviepy. Defaults to False.
+            fps (int, optional): Frame rate the text fades of the LayerCompositor are baked at, which should match the render. Defaults to the context's fps.
+
+        Returns:
+            CompositeVideoClip | LayerCompositor: Composite video clip for the title card.
+        """
+
+        context = self.__context or RenderContext.default()
+        fps = fps or context.fps
+
+        # The audio of the video is mixed by the AudioMixer like added audio, so the video's audio reader isn't opened.
+        bg_clip = VideoFileClip(self.__bg_video_path, audio= False).subclip(0, self.__duration)
+        bg_clip = self._set_audio_clip(bg_clip)
+        bg_clip = bg_clip.fx(vfx.resize, width= context.width, height= context.height)
+
+        if compositor:
+            title_card_clip = LayerCompositor(bg_clip, self.__text_layers(fps), bg_clip.duration)
+        else:
+            title_card_clip = CompositeVideoClip([bg_clip] + self.__text_clips)
+        title_card_clip.fingerprint = self._fingerprint("compositor" if compositor else "moviepy")
+        title_card_clip.stream_copy_span = self._stream_copy_span()
+        title_card_clip.audio_regions = self._audio_regions()
+
+        return title_card_clip
+
+
+class StaticSlideClip(VideoClip):
+    """
+    A class to composite text overlays on a still background that is rendered only once.
+    """
+
+    def __init__(self, bg_clip: ImageClip, text_clips: list):
+        self.__background = np.ascontiguousarray(bg_clip.get_frame(0))
+        self.__background.setflags(write= False)
+        self.__text_clips = text_clips
+
+        super().__init__(make_frame= self.__make_frame, duration= bg_clip.duration)
+        self.audio = bg_clip.audio
+
+    def __make_frame(self, t: float) -> np.ndarray:
+        """
+        Build the frame at the given time.
+
+        Frames without a visible overlay are the cached background itself,
+        otherwise only the regions covered by the overlays are blitted.
+
+        Args:
+            t (float): Time of the frame.
+
+        Returns:
+            np.ndarray: Frame at time t.
+        """
+
+        frame = self.__background
+        with RenderProfiler.stage("composite"):
+            for text_clip in self.__text_clips:
+                if text_clip.is_playing(t):
+                    frame = text_clip.blit_on(frame, t)
+
+        return frame
+
+
+class Slide(Audio):
+    """
+    A class to create a slide in a video.
+    """
+
+    def __init__(self, image_path: str, slide_duration: int, context: RenderContext = None):
+        super().__init__()
+
+        self.__image_path = image_path
+        self.__slide_duration = slide_duration
+        self.__context = context
+        self.__text_clips = []
+        self.__text_params = []
+
+    def __create_text(self, text: str, font: str, font_size: int, text_bg_path: str, text_color: str, duration: int) -> CompositeVideoClip:
+        """
+        Create a text overlay.
+
+        Args:
+            text (str): Text content.
+            font (str): Font to use.
+            font_size (int): Font size.
+            text_bg_path (str): Path to the text background.
+            text_color (str): Text color.
+            duration (int): Duration of the text overlay.
+
+        Returns:
+            CompositeVideoClip: Composite video clip for the text overlay.
+        """
+         
+        text_duration = self.__slide_duration * 0.45 if duration == -1 else duration
+
+        txt_clip = TextCache.text_clip(text, font, font_size, text_color, (self.__context or RenderContext.default()).backend())
+        txt_width, txt_height = txt_clip.size
+
+        txt_bg = ImageClip(AssetCache.image(text_bg_path, (txt_width * 1.4, txt_height * 1.4)))
+        txt_bg = txt_bg.set_duration(text_duration)
+
+        txt_clip = txt_clip.set_position('center').set_start(1).set_end(text_duration).crossfadein(1)
+
+        return CompositeVideoClip([txt_bg, txt_clip])
+    
+    def __caption_layers(self, fps: int) -> list[Layer]:
+        """
+        Describe the captions of the slide as compositor layers, each a background box and its text.
+
+        Args:
+            fps (int): Frame rate the motion is baked at.
+
+        Returns:
+            list[Layer]: Layers of the captions.
+        """
+
+        context = self.__context or RenderContext.default()
+        layers = []
+        for text, postion, font, font_size, text_bg_path, text_color, direction, start, text_duration, easing, motion in self.__text_params:
+            text_duration = self.__slide_duration * 0.45 if text_duration == -1 else text_duration
+
+            img, mask = TextCache.raster(text, font, font_size, text_color, context.backend())
+            txt_height, txt_width = mask.shape
+            txt_bg = AssetCache.image(text_bg_path, (txt_width * 1.4, txt_height * 1.4))
+            bg_height, bg_width = txt_bg.shape[:2]
+
+            box_motion = motion or Motion.slide_in(direction, (bg_width, bg_height), postion, easing= easing, frame_size= context.size())
+            offset = (int((bg_width - txt_width) / 2), int((bg_height - txt_height) / 2))
+
+            # The text fades in a second after its box, centered on it.
+            layers.append(Layer(txt_bg, txt_bg[:, :, 3] if txt_bg.shape[2] == 4 else None, start, start + text_duration, box_motion, fps= fps))
+            layers.append(Layer(img, np.round(mask * 255), start + 1, start + text_duration, box_motion.shifted(*offset, dt= -1), 1, fps))
+
+        return layers
+
+    def add_text(self, text: str, postion: tuple[int, int], font: str, font_size: int, text_bg_path: str, text_color: str = "white", direction: str = "right", start: int = 0, text_duration: int = -1, easing: str = "linear", motion: Motion | list = None) -> None:
+        """
+        Add text to the slide.
+
+        Args:
+            text (str): Text content.
+            postion (tuple): Position coordinates (x, y) for the text.
+            font (str): Font to use.
+            font_size (int): Font size.
+            text_bg_path (str): Path to the text background.
+            text_color (str, optional): Text color. Defaults to "white".
+            direction (str, optional): Direction of text animation. Defaults to "right".
+            start (int, optional): Start time for the text. Defaults to 0.
+            text_duration (int, optional): Duration for the text. Defaults to -1.
+            easing (str, optional): Easing curve of the slide-in: "linear", "ease_in", "ease_out" or "ease_in_out". Defaults to "linear".
+            motion (Motion | list, optional): Motion of the caption's top left corner, or its (time, x, y[, opacity]) keyframes,
+                replacing the slide-in. Defaults to None.
+        """
+
+        if motion is not None and not isinstance(motion, Motion):
+            motion = Motion(motion, easing)
+
+        txt_overlay = self.__create_text(text, font, font_size, text_bg_path, text_color, text_duration)
+        frame_size = (self.__context or RenderContext.default()).size()
+        txt_overlay = txt_overlay.set_position((motion or Motion.slide_in(direction, txt_overlay.size, postion, easing= easing, frame_size= frame_size)).position)
+        if motion is not None and not motion.is_opaque():
+            txt_overlay = txt_overlay if txt_overlay.mask is not None else txt_overlay.add_mask()
+            txt_overlay = txt_overlay.set_mask(txt_overlay.mask.fl(lambda get_frame, t: get_frame(t) * motion.at(t)[2]))
+
+        self.__text_clips.append(txt_overlay.set_start(start))
+        self.__text_params.append((text, postion, font, font_size, text_bg_path, text_color, direction, start, text_duration, easing, motion))
+
+    def duration(self) -> int:
+        """
+        Get the duration of the slide.
+
+        Returns:
+            int: Duration in seconds.
+        """
+
+        return self.__slide_duration
+
+    def _fingerprint(self, mode: str = "moviepy") -> str:
+        """
+        Get the hash of everything that affects the frames of the slide.
+
+        Args:
+            mode (str, optional): How the slide is composited: "moviepy", "static" or "compositor". Defaults to "moviepy".
+
+        Returns:
+            str: Fingerprint of the slide.
+        """
+
+        context = self.__context or RenderContext.default()
+
+        return SegmentCache.fingerprint("slide", self.__image_path, self.__slide_duration, self.__text_params, context.backend(), context.width, context.height, mode)
+
+    def make_slide(self, static_background: bool = False, compositor: bool = False, fps: int = None) -> CompositeVideoClip | StaticSlideClip | LayerCompositor:
+        """
+        Create the slide as a CompositeVideoClip.
+
+        Args:
+            static_background (bool, optional): Render the still background once and only composite the text overlays on top of it. Defaults to False.
+            compositor (bool, optional): Composite the captions with the LayerCompositor instead of moviepy. Defaults to False.
+            fps (int, optional): Frame rate the caption motion of the LayerCompositor is baked at, which should match the render. Defaults to the context's fps.
+
+        Returns:
+            CompositeVideoClip | StaticSlideClip | LayerCompositor: Composite video clip for the slide.
+        """
+
+        context = self.__context or RenderContext.default()
+        fps = fps or context.fps
+
+        img_clip = ImageClip(AssetCache.image(self.__image_path, context.size()))
+        img_clip = img_clip.set_duration(self.__slide_duration)
+        img_clip = self._set_audio_clip(img_clip)
+
+        if compositor:
+            slide_clip = LayerCompositor(img_clip.img, self.__caption_layers(fps), self.__slide_duration)
+            slide_clip.audio = img_clip.audio
+        elif static_background:
+            slide_clip = StaticSlideClip(img_clip, self.__text_clips)
+        else:
+            slide_clip = CompositeVideoClip([img_clip] + self.__text_clips)
+        slide_clip.fingerprint = self._fingerprint("compositor" if compositor else "static" if static_background else "moviepy")
+        slide_clip.audio_regions = self._audio_regions()
+
+        return slide_clip
+
+
+class EndCard(Audio):
+    """
+    A class to create an end card for a video.
+    """
+
+    def __init__(self, end_video_path: str, duration: int, context: RenderContext = None):
+        super().__init__()
+
+        self.__end_video_path = end_video_path
+        self.__duration = duration
+        self.__context = context
+        self.__text_clips = []
+        self.__text_params = []
+
+    def add_text(self, text: str, postionY: int, font: str, font_size: int, color: str = "white", start: int = 1, fadein: int = 1) -> None:
+        """
+        Add text to the end card.
+
+        Args:
+            text (str): Text content.
+            postionY (int): Y position of the text.
+            font (str): Font to use.
+            font_size (int): Font size.
+            color (str, optional): Text color. Defaults to "white".
+            start (int, optional): Start time for the text. Defaults to 1.
+            fadein (int, optional): Fade-in duration. Defaults to 1.
+        """
+
+        txt_overlay = TextCache.text_clip(text, font, font_size, color, (self.__context or RenderContext.default()).backend())
+        txt_overlay = txt_overlay.set_position(('center', postionY)).set_start(start).set_end(self.__duration).crossfadein(fadein)
+
+        self.__text_clips.append(txt_overlay)
+        self.__text_params.append((text, postionY, font, font_size, color, start, fadein))
+    
+    def duration(self) -> int:
+        """
+        Get the duration of the end card.
+
+        Returns:
+            int: Duration in seconds.
+        """
+
+        return self.__duration
+
+    def _fingerprint(self, mode: str = "moviepy") -> str:
+        """
+        Get the hash of everything that affects the frames of the end card.
+
+        Args:
+            mode (str, optional): How the end card is composited: "moviepy" or "compositor". Defaults to "moviepy".
+
+        Returns:
+            str: Fingerprint of the end card.
+        """
+
+        context = self.__context or RenderContext.default()
+
+        return SegmentCache.fingerprint("end_card", self.__end_video_path, self.__duration, self.__text_params, context.backend(), context.width, context.height, mode)
+
+    def _audio_regions(self) -> list[tuple]:
+        """
+        Describe the audio of the end card as regions for the AudioMixer, the video's own audio if none was added.
+
+        Returns:
+            list[tuple]: Path, start, end, volume and play time of each region.
+        """
+
+        return super()._audio_regions(self.__end_video_path, self.__duration)
+
+    def _stream_copy_span(self) -> tuple[str, float]:
+        """
+        Get the span at the start of the end card that has no text on it.
+
+        Returns:
+            tuple[str, float]: Path of the video and the end of the span in seconds.
+        """
+
+        return self.__end_video_path, min([params[5] for params in self.__text_params] + [self.__duration])
+
+    def __text_layers(self, fps: int) -> list[Layer]:
+        """
+        Describe the text of the end card as compositor layers.
+
+        Args:
+            fps (int): Frame rate the fades are baked at.
+
+        Returns:
+            list[Layer]: Layers of the text.
+        """
+
+        context = self.__context or RenderContext.default()
+        layers = []
+        for text, postionY, font, font_size, color, start, fadein in self.__text_params:
+            img, mask = TextCache.raster(text, font, font_size, color, context.backend())
+            position = ((context.width - img.shape[1]) / 2, postionY)
+            layers.append(Layer(img, np.round(mask * 255), start, self.__duration, position, fadein, fps))
+
+        return layers
+
+    def make_end_card(self, compositor: bool = False, fps: int = None) -> CompositeVideoClip | LayerCompositor:
+        """
+        Create the end card as a CompositeVideoClip.
+
+        Args:
+            compositor (bool, optional): Composite the text with the LayerCompositor instead of moviepy. Defaults to False.
+            fps (int, optional): Frame rate the text fades of the LayerCompositor are baked at, which should match the render. Defaults to the context's fps.
+
+        Returns:
+            CompositeVideoClip | LayerCompositor: Composite video clip for the end card.
+        """
+
+        context = self.__context or RenderContext.default()
+        fps = fps or context.fps
+
+        end_clip = VideoFileClip(self.__end_video_path, audio= False).subclip(0, self.__duration)
+        end_clip = self._set_audio_clip(end_clip)
+        end_clip = end_clip.fx(vfx.resize, width= context.width, height= context.height)
+
+        if compositor:
+            end_card_clip = LayerCompositor(end_clip, self.__text_layers(fps), end_clip.duration)
+        else:
+            end_card_clip = CompositeVideoClip([end_clip] + self.__text_clips)
+        end_card_clip.fingerprint = self._fingerprint("compositor" if compositor else "moviepy")
+        end_card_clip.stream_copy_span = self._stream_copy_span()
+        end_card_clip.audio_regions = self._audio_regions()
+
+        return end_card_clip
+    
+
+class StreamingClip(VideoClip):
+    """
+    A class to play clips one after another, building each clip only when it is reached and releasing it afterwards.
+    """
+
+    def __init__(self, segments: list[tuple[float, Callable]]):
+        self.__factories = [factory for _, factory in segments]
+        self.__starts = np.concatenate([[0], np.cumsum([duration for duration, _ in segments])])
+        self.__video = (None, None)
+        self.__audio = (None, None)
+
+        super().__init__(make_frame= self.__make_frame, duration= self.__starts[-1])
+        self.audio = AudioClip(self.__make_audio_frame, duration= self.duration, fps= 44100)
+
+    @staticmethod
+    def __release(clip) -> None:
+        """
+        Close the readers of a clip and of every clip it is made of.
+
+        Args:
+            clip: Clip to release.
+        """
+
+        for child in getattr(clip, "clips", []):
+            StreamingClip.__release(child)
+        if getattr(clip, "audio", None) is not None:
+            StreamingClip.__release(clip.audio)
+        clip.close()
+
+    def __segment(self, current: tuple, index: int) -> tuple:
+        """
+        Get the clip of a segment, releasing the previously built one when moving on.
+
+        Args:
+            current (tuple): Index and clip of the segment built last.
+            index (int): Index of the segment.
+
+        Returns:
+            tuple: Index and clip of the segment.
+        """
+
+        current_index, clip = current
+        if current_index == index:
+            return current
+
+        if clip is not None:
+            StreamingClip.__release(clip)
+        clip = self.__factories[index]()
+        RenderProfiler.instrument(clip)
+
+        return index, clip
+
+    def __index(self, t):
+        """
+        Get the index of the segment playing at the given times.
+
+        Args:
+            t: Time or array of times.
+
+        Returns:
+            Segment index or array of indices.
+        """
+
+        return np.clip(np.searchsorted(self.__starts, t, side= "right") - 1, 0, len(self.__factories) - 1)
+
+    def __make_frame(self, t: float) -> np.ndarray:
+        """
+        Build the frame at the given time.
+
+        Args:
+            t (float): Time of the frame.
+
+        Returns:
+            np.ndarray: Frame at time t.
+        """
+
+        index = int(self.__index(t))
+        self.__video = self.__segment(self.__video, index)
+
+        return self.__video[1].get_frame(t - self.__starts[index])
+
+    def __make_audio_frame(self, t) -> np.ndarray:
+        """
+        Build the stereo audio samples at the given times.
+
+        Args:
+            t: Time or array of times.
+
+        Returns:
+            np.ndarray: Audio samples.
+        """
+
+        times = np.atleast_1d(t)
+        samples = np.zeros((len(times), 2))
+        indices = self.__index(times)
+
+        for index in np.unique(indices):
+            self.__audio = self.__segment(self.__audio, index)
+            audio_clip = self.__audio[1].audio
+            if audio_clip is not None:
+                selected = indices == index
+                samples[selected] = np.asarray(audio_clip.get_frame(times[selected] - self.__starts[index])).reshape(selected.sum(), -1)
+
+        return samples if np.ndim(t) else samples[0]
+
+    def close(self) -> None:
+        """
+        Release the clips built last.
+        """
+
+        for _, clip in (self.__video, self.__audio):
+            if clip is not None:
+                StreamingClip.__release(clip)
+        self.__video = self.__audio = (None, None)
+
+
+class MediaProbe:
+    """
+    A class to inspect video files with ffmpeg.
+    """
+
+    __codec_names = {"libx264": "h264", "h264_nvenc": "h264", "nvenc_h264": "h264", "h264_qsv": "h264", "libx265": "hevc", "hevc_nvenc": "hevc",
+                     "libvpx": "vp8", "libvpx-vp9": "vp9", "libtheora": "theora", "mpeg4": "mpeg4", "libxvid": "mpeg4"}
+
+    @staticmethod
+    def __ffmpeg_stderr(*args: str) -> str:
+        """
+        Run ffmpeg and get what it printed to stderr.
+
+        Args:
+            *args (str): Arguments passed to ffmpeg.
+
+        Returns:
+            str: stderr of ffmpeg.
+        """
+
+        return subprocess.run([get_setting("FFMPEG_BINARY"), "-hide_banner", *args], stdout= subprocess.DEVNULL, stderr= subprocess.PIPE).stderr.decode(errors= "replace")
+
+    @staticmethod
+    def codec_name(codec: str) -> str:
+        """
+        Get the name of the format an ffmpeg encoder produces.
+
+        Args:
+            codec (str): Name of the encoder, e.g. "libx264".
+
+        Returns:
+            str: Name of the format, e.g. "h264".
+        """
+
+        return MediaProbe.__codec_names.get(codec, codec)
+
+    @staticmethod
+    def probe(path: str) -> dict | None:
+        """
+        Get the codec, pixel format, size and frame rate of the first video stream of a file.
+
+        Args:
+            path (str): Path to the video.
+
+        Returns:
+            dict | None: Stream properties, or None if there's no video stream.
+        """
+
+        stderr = MediaProbe.__ffmpeg_stderr("-i", path)
+        stream = re.search(r"Stream #\S+: Video: (\w+).*?, (\w+)(?:\([^)]*\))?, (\d+)x(\d+).*?, ([\d.]+) fps", stderr)
+        if stream is None:
+            return None
+        codec, pix_fmt, width, height, fps = stream.groups()
+
+        return {"codec": codec, "pix_fmt": pix_fmt, "width": int(width), "height": int(height), "fps": float(fps)}
+
+    @staticmethod
+    def keyframes(path: str) -> list[float]:
+        """
+        Get the times of the keyframes of the first video stream of a file.
+
+        Args:
+            path (str): Path to the video.
+
+        Returns:
+            list[float]: Keyframe times in seconds.
+        """
+
+        stderr = MediaProbe.__ffmpeg_stderr("-skip_frame", "nokey", "-i", path, "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-")
+
+        return [float(pts_time) for pts_time in re.findall(r"pts_time:([\d.]+)", stderr)]
+
+
+class EncoderProfile:
+    """
+    A class to pick the encoder settings of a quality/speed profile from the encoders ffmpeg provides.
+    """
+
+    # Candidates in order of preference: encoder, preset and extra ffmpeg parameters. libx264 is always last as the CPU fallback.
+    __profiles = {
+        "draft": [("h264_nvenc", "p1", ["-cq", "30", "-pix_fmt", "yuv420p"]),
+                  ("h264_qsv", "veryfast", ["-global_quality", "30", "-pix_fmt", "nv12"]),
+                  ("libx264", "ultrafast", ["-crf", "28", "-tune", "fastdecode"])],
+        "balanced": [("h264_nvenc", "p4", ["-cq", "23", "-pix_fmt", "yuv420p"]),
+                     ("h264_qsv", "medium", ["-global_quality", "23", "-pix_fmt", "nv12"]),
+                     ("libx264", "fast", ["-crf", "23"])],
+        "archive": [("libx264", "slow", ["-crf", "18"])],
+    }
+    __available = {}
+
+    @staticmethod
+    def profiles() -> list[str]:
+        """
+        Get the names of the profiles.
+
+        Returns:
+            list[str]: Profile names, from fastest to highest quality.
+        """
+
+        return list(EncoderProfile.__profiles)
+
+    @staticmethod
+    def available(codec: str) -> bool:
+        """
+        Check whether ffmpeg can encode with an encoder on this machine.
+
+        Hardware encoders are listed by ffmpeg even without a matching device, so each one is tried on a single frame.
+        The result is cached for the lifetime of the process.
+
+        Args:
+            codec (str): Name of the encoder, e.g. "h264_nvenc".
+
+        Returns:
+            bool: True if the encoder works.
+        """
+
+        if codec not in EncoderProfile.__available:
+            listed = subprocess.run([get_setting("FFMPEG_BINARY"), "-hide_banner", "-encoders"], stdout= subprocess.PIPE, stderr= subprocess.DEVNULL).stdout.decode(errors= "replace")
+            works = re.search(rf"^\s*V\S*\s+{re.escape(codec)}\s", listed, re.MULTILINE) is not None
+            if works:
+                works = subprocess.run([get_setting("FFMPEG_BINARY"), "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                                        "-frames:v", "1", "-c:v", codec, "-f", "null", "-"], stdout= subprocess.DEVNULL, stderr= subprocess.DEVNULL).returncode == 0
+            EncoderProfile.__available[codec] = works
+
+        return EncoderProfile.__available[codec]
+
+    @staticmethod
+    def select(profile: str, extension: str = ".mp4", codec: str = None, workers: int = 1) -> dict:
+        """
+        Pick the codec, preset, thread count and extra ffmpeg parameters of a profile.
+
+        The first available encoder of the profile is used. Outputs that can't hold H.264 keep the default codec
+        of their extension and only get the thread count.
+
+        Args:
+            profile (str): "draft", "balanced" or "archive".
+            extension (str, optional): File extension of the output. Defaults to ".mp4".
+            codec (str, optional): Encoder to try first, falling back to the profile's encoders if it isn't available. Defaults to None.
+            workers (int, optional): Number of encoders running at the same time, which share the CPU cores. Defaults to 1.
+
+        Returns:
+            dict: "codec", "preset", "threads" and "ffmpeg_params" for the render.
+        """
+
+        if profile not in EncoderProfile.__profiles:
+            raise ValueError(f"Unknown encoder profile: {profile}")
+
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        candidates = EncoderProfile.__profiles[profile]
+        if extension.lstrip(".").lower() not in ("mp4", "mkv", "mov", "avi"):
+            return {"codec": codec, "preset": candidates[-1][1], "threads": threads, "ffmpeg_params": None}
+
+        if codec:
+            matching = [candidate for candidate in candidates if candidate[0] == codec]
+            candidates = (matching or [(codec, candidates[-1][1], [])]) + candidates
+        for name, preset, ffmpeg_params in candidates:
+            if EncoderProfile.available(name):
+                if codec and name != codec:
+                    print(f"Encoder {codec} is not available, falling back to {name}.")
+                # Hardware encoders don't use the CPU threads, so they don't take any away from compositing.
+                return {"codec": name, "preset": preset, "threads": threads if name.startswith("lib") else 1, "ffmpeg_params": list(ffmpeg_params)}
+
+        raise RuntimeError(f"None of the encoders of the {profile} profile are available.")
+
+
+class SegmentCache:
+    """
+    A class to keep encoded segments on disk, addressed by the hash of their inputs.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = 10 * 1024 ** 3):
+        self.__cache_dir = cache_dir
+        self.__max_size = max_size
+        os.makedirs(cache_dir, exist_ok= True)
+
+    @staticmethod
+    def __describe(part):
+        """
+        Make a hashable description of a fingerprint part, with files described by their path, mtime and size.
+
+        Args:
+            part: Value to describe.
+
+        Returns:
+            Description of the value.
+        """
+
+        if isinstance(part, (list, tuple)):
+            return tuple(SegmentCache.__describe(item) for item in part)
+        if isinstance(part, str) and os.path.isfile(part):
+            stat = os.stat(part)
+            return (os.path.abspath(part), stat.st_mtime_ns, stat.st_size)
+
+        return part
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        """
+        Hash the inputs of a segment.
+
+        Args:
+            *parts: Values the segment depends on. File paths are hashed with their mtime and size.
+
+        Returns:
+            str: Hex digest of the inputs.
+        """
+
+        return hashlib.sha256(repr(SegmentCache.__describe(parts)).encode()).hexdigest()
+
+    def __path(self, key: str, extension: str) -> str:
+        """
+        Get the path of a segment in the cache directory.
+
+        Args:
+            key (str): Key of the segment.
+            extension (str): File extension of the segment.
+
+        Returns:
+            str: Path of the segment.
+        """
+
+        return os.path.join(self.__cache_dir, key + extension)
+
+    def get(self, key: str, extension: str) -> str | None:
+        """
+        Look up an encoded segment and mark it as recently used.
+
+        Args:
+            key (str): Key of the segment.
+            extension (str): File extension of the segment.
+
+        Returns:
+            str | None: Path of the cached segment, or None on a miss.
+        """
+
+        path = self.__path(key, extension)
+        if not os.path.isfile(path):
+            return None
+        os.utime(path)
+
+        return path
+
+    def put(self, key: str, path: str, extension: str) -> str:
+        """
+        Move an encoded segment into the cache.
+
+        Args:
+            key (str): Key of the segment.
+            path (str): Path of the encoded segment.
+            extension (str): File extension of the segment.
+
+        Returns:
+            str: Path of the cached segment.
+        """
+
+        cached_path = self.__path(key, extension)
+        # Each writer moves its segment in under a name of its own, so renders sharing the cache can store the same key at once.
+        handle, temp_path = tempfile.mkstemp(suffix= ".tmp", dir= self.__cache_dir)
+        os.close(handle)
+        shutil.move(path, temp_path)
+        os.replace(temp_path, cached_path)
+
+        return cached_path
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used segments until the cache fits in its maximum size.
+        """
+
+        entries = [entry for entry in os.scandir(self.__cache_dir) if entry.is_file() and not entry.name.endswith(".tmp")]
+        entries.sort(key= lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in entries)
+
+        for entry in entries:
+            if size <= self.__max_size:
+                break
+            size -= entry.stat().st_size
+            os.remove(entry.path)
+
+
+class FrameResizer:
+    """
+    A class to crop and scale frames to an output size with area averaging, using weights computed once per size.
+    """
+
+    def __init__(self, source_size: tuple[int, int], size: tuple[int, int], crop: tuple[int, int, int, int] = None):
+        if crop is None:
+            # Fill the output: keep the largest centered window with its aspect ratio.
+            crop_width = min(source_size[0], round(source_size[1] * size[0] / size[1]))
+            crop_height = min(source_size[1], round(source_size[0] * size[1] / size[0]))
+            crop = ((source_size[0] - crop_width) // 2, (source_size[1] - crop_height) // 2, crop_width, crop_height)
+        x, y, crop_width, crop_height = crop
+        if x < 0 or y < 0 or x + crop_width > source_size[0] or y + crop_height > source_size[1]:
+            raise ValueError(f"Crop {crop} is outside of the {source_size[0]}x{source_size[1]} frame.")
+
+        self.size = tuple(size)
+        self.crop = (x, y, crop_width, crop_height)
+        self.__identity = self.crop == (0, 0, *source_size) and self.size == tuple(source_size)
+        self.__rows = FrameResizer.__weights(y, crop_height, size[1])
+        self.__columns = FrameResizer.__weights(x, crop_width, size[0])
+
+    @staticmethod
+    def __weights(offset: int, length: int, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the source pixels each output pixel of one axis averages and how much of each it covers.
+
+        Args:
+            offset (int): First source pixel of the crop.
+            length (int): Number of source pixels in the crop.
+            count (int): Number of output pixels.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Source indices and weights, both (count, taps).
+        """
+
+        scale = length / count
+        edges = np.arange(count + 1) * scale
+        first = np.floor(edges[:-1]).astype(np.int64)
+        taps = int(np.max(np.ceil(edges[1:]) - first))
+
+        indices = np.minimum(first[:, None] + np.arange(taps), length - 1)
+        pixel = first[:, None] + np.arange(taps)
+        coverage = np.minimum(pixel + 1, edges[1:, None]) - np.maximum(pixel, edges[:-1, None])
+        weights = np.clip(coverage, 0, None) / np.clip(coverage, 0, None).sum(axis= 1, keepdims= True)
+
+        return indices + offset, weights.astype(np.float32)
+
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Crop and scale a frame.
+
+        Args:
+            frame (np.ndarray): RGB frame of the source size.
+
+        Returns:
+            np.ndarray: RGB frame of the output size, the frame itself if the sizes match and nothing is cropped.
+        """
+
+        if self.__identity:
+            return frame
+
+        with RenderProfiler.stage("resize"):
+            # Rows, then columns: each tap gathers one source pixel per output pixel and adds its weighted share.
+            indices, weights = self.__rows
+            rows = np.take(frame, indices[:, 0], axis= 0) * weights[:, 0, None, None]
+            for tap in range(1, indices.shape[1]):
+                rows += np.take(frame, indices[:, tap], axis= 0) * weights[:, tap, None, None]
+
+            indices, weights = self.__columns
+            output = np.take(rows, indices[:, 0], axis= 1)
+            output *= weights[:, 0, None]
+            for tap in range(1, indices.shape[1]):
+                share = np.take(rows, indices[:, tap], axis= 1)
+                share *= weights[:, tap, None]
+                output += share
+            output += 0.5
+
+            return output.astype(np.uint8)
+
+
+class FFmpegPipeWriter:
+    """
+    A class to encode raw frames through a persistent ffmpeg process, writing on a separate thread.
+    """
+
+    def __init__(self, output_filename: str, size: tuple[int, int], fps: int = 60, preset: str = "medium", codec: str = None, threads: int = 2, audiofile: str = None, audio_codec: str = None, ffmpeg_params: list[str] = None):
+        extension = os.path.splitext(output_filename)[1][1:].lower()
+        if codec is None:
+            if "codec" not in extensions_dict.get(extension, {}):
+                raise ValueError(f"No default codec for the extension of {output_filename}, set the codec explicitly.")
+            codec = extensions_dict[extension]["codec"][0]
+
+        command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-vcodec", "rawvideo", "-s", f"{size[0]}x{size[1]}", "-pix_fmt", "rgb24", "-r", f"{fps:.02f}", "-an", "-i", "-"]
+        if audiofile:
+            command += ["-i", audiofile, "-acodec", audio_codec or ("libvorbis" if extension in ("ogv", "webm") else "libmp3lame")]
+        command += ["-vcodec", codec, "-preset", preset, "-threads", str(threads)]
+        if codec == "libx264" and size[0] % 2 == 0 and size[1] % 2 == 0:
+            command += ["-pix_fmt", "yuv420p"]
+        command += (ffmpeg_params or []) + [output_filename]
+
+        self.closed = False
+        self.__proc = subprocess.Popen(command, stdin= subprocess.PIPE, stdout= subprocess.DEVNULL, stderr= subprocess.PIPE)
+        # One frame waits in the queue while the writer thread sends the previous one, so compositing overlaps writing.
+        self.__frames = queue.Queue(maxsize= 1)
+        self.__error = None
+        self.__writer = threading.Thread(target= self.__write_loop, daemon= True)
+        self.__writer.start()
+
+    def __write_loop(self) -> None:
+        """
+        Send queued frames to ffmpeg until the end marker is queued.
+        """
+
+        while True:
+            item = self.__frames.get()
+            if item is None:
+                return
+            frame, segment = item
+            if self.__error is None:
+                try:
+                    # The encode time is recorded under the segment the frame was queued from.
+                    RenderProfiler.set_segment(segment)
+                    with RenderProfiler.stage("encode"):
+                        self.__proc.stdin.write(memoryview(frame))
+                except OSError as error:
+                    self.__error = error
+
+    def write_frame(self, frame: np.ndarray) -> None:
+        """
+        Queue a frame for encoding without copying it.
+
+        The frame must not be modified until two more frames have been written.
+
+        Args:
+            frame (np.ndarray): RGB frame.
+
+        Raises:
+            OSError: If ffmpeg stopped taking frames. Closing the writer then raises with the message of ffmpeg.
+        """
+
+        if self.__error is not None:
+            raise self.__error
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+
+        self.__frames.put((np.ascontiguousarray(frame), RenderProfiler.segment()))
+
+    def close(self) -> None:
+        """
+        Flush the queued frames and wait for ffmpeg to finish the file. Closing it again does nothing.
+
+        Raises:
+            IOError: If ffmpeg failed, with its error message.
+        """
+
+        if self.closed:
+            return
+        self.closed = True
+
+        if self.__writer.is_alive():
+            self.__frames.put(None)
+            self.__writer.join()
+        try:
+            self.__proc.stdin.close()
+        except OSError as error:
+            self.__error = self.__error or error
+        stderr = self.__proc.stderr.read().decode(errors= "replace")
+        self.__proc.stderr.close()
+
+        if self.__proc.wait() != 0 or self.__error is not None:
+            raise IOError(f"ffmpeg failed to encode the video:\n{stderr}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RenderClips(Audio):
+    """
+    A class to render video clips.
+    """
+
+    __worker = threading.local()
+
+    def __init__(self, clips: list, stream: bool = False, context: RenderContext = None):
+        super().__init__()
+
+        self.__context = context or RenderContext.default()
+
+        if stream:
+            clips = list(clips)
+            self.__segments = [RenderClips.__lazy_segment(item) for item in clips]
+            self.__clip_audio = [item._audio_regions() if isinstance(item, Audio) else None for item in clips]
+            self.__final_clip = StreamingClip([(duration, factory) for duration, factory, _, _ in self.__segments])
+        else:
+            clips = list(clips)
+            self.__segments = [(clip.duration, None, getattr(clip, "fingerprint", None), getattr(clip, "stream_copy_span", None)) for clip in clips]
+            self.__clip_audio = [getattr(clip, "audio_regions", None) for clip in clips]
+            self.__final_clip = concatenate_videoclips(clips)
+        self.__sub_clip = None
+        self.__sub_range = None
+
+    @staticmethod
+    def __lazy_segment(item: TitleCard | Slide | EndCard | tuple) -> tuple:
+        """
+        Describe a deck item as a duration, a factory building its clip, a fingerprint and a span that can be stream copied.
+
+        Args:
+            item (TitleCard | Slide | EndCard | tuple): Card or slide, or a (duration, factory) pair.
+
+        Returns:
+            tuple: Duration, factory, fingerprint and stream copy span of the item.
+        """
+
+        if isinstance(item, TitleCard):
+            return item.duration(), item.make_title_card, item._fingerprint(), item._stream_copy_span()
+        if isinstance(item, Slide):
+            return item.duration(), item.make_slide, item._fingerprint(), None
+        if isinstance(item, EndCard):
+            return item.duration(), item.make_end_card, item._fingerprint(), item._stream_copy_span()
+
+        duration, factory = item
+        return duration, factory, None, None
+
+    @staticmethod
+    def __render_time(func):
+        """
+        Decorator to measure rendering time.
+
+        Args:
+            func (function): Function to be decorated.
+
+        Returns:
+            function: Decorated function.
+        """
+
+        def wrapper(*args, **kwargs):
+            start = timer()
+            with RenderProfiler.stage("render"):
+                result = func(*args, **kwargs)
+            end = timer()
+            print(f"Render completed in: {int((end - start))} seconds")
+
+            return result
+        
+        return wrapper
+
+    def sub_clip(self, start: int, end: int) -> None:
+        """
+        Subset the final video clip based on the provided start and end times.
+
+        Args:
+            start (int): Start time for subsetting.
+            end (int): End time for subsetting.
+        """
+
+        duration = self.__final_clip.duration
+        self.__sub_range = (min(duration, start), min(duration, end))
+        self.__sub_clip = self.__final_clip.subclip(*self.__sub_range)
+
+    def __soundtrack(self, timeline: VideoClip, bounds: tuple[float, float], absolute: bool = False) -> AudioClip | None:
+        """
+        Get the soundtrack of a part of the video, decoding its files ahead of the video encode.
+
+        Audio added to the render replaces the audio of the clips. Otherwise the audio of each card and slide plays
+        within its own clip. Both are mixed by the AudioMixer from decoded files, unless some clip wasn't made by
+        a card or slide, in which case the moviepy audio of the timeline is used.
+
+        Args:
+            timeline (VideoClip): Part of the video being rendered.
+            bounds (tuple[float, float]): Start and end of the part on the whole video.
+            absolute (bool, optional): Play audio added to the render at its time on the whole video instead of relative to the start of the part. Defaults to False.
+
+        Returns:
+            AudioClip | None: Soundtrack, or None if there's no audio.
+        """
+
+        start, end = bounds
+        regions = self._audio_regions()
+        if regions:
+            offset = start if absolute else 0
+            regions = [(path, audio_start, audio_end, volume, play_audio_at - offset) for path, audio_start, audio_end, volume, play_audio_at in regions]
+        elif all(clip_regions is not None for clip_regions in self.__clip_audio):
+            clip_start = 0
+            for (duration, _, _, _), clip_regions in zip(self.__segments, self.__clip_audio):
+                regions += [(path, audio_start, audio_end, volume, clip_start + play_audio_at - start, duration - play_audio_at)
+                            for path, audio_start, audio_end, volume, play_audio_at in clip_regions]
+                clip_start += duration
+        else:
+            audio_clip = timeline.audio
+            return audio_clip.set_duration(timeline.duration) if audio_clip else None
+
+        if not AudioMixer.has_audio(regions):
+            return None
+
+        return AudioMixer.clip(regions, end - start)
+
+    @staticmethod
+    def __write_pipe(clip: VideoClip, output_filename: str, audio_clip: AudioClip | None, fps: int, preset: str, codec: str, threads: int, ffmpeg_params: list[str]) -> None:
+        """
+        Write a clip through the FFmpegPipeWriter.
+
+        Args:
+            clip (VideoClip): Clip to write.
+            output_filename (str): Output filename.
+            audio_clip (AudioClip | None): Soundtrack to mux in, or None for no audio.
+            fps (int): Frames per second.
+            preset (str): Encoding preset.
+            codec (str): Video codec.
+            threads (int): Number of ffmpeg threads.
+            ffmpeg_params (list[str]): Extra ffmpeg output parameters.
+        """
+
+        with tempfile.TemporaryDirectory(dir= os.path.dirname(os.path.abspath(output_filename))) as work_dir:
+            audio_path = None
+            if audio_clip is not None:
+                audio_path = os.path.join(work_dir, "audio.wav")
+                AudioMixer.write_wav(audio_clip, audio_path)
+
+            with FFmpegPipeWriter(output_filename, clip.size, fps, preset, codec, threads, audio_path, ffmpeg_params= ffmpeg_params) as writer:
+                for t in np.arange(0, clip.duration, 1.0 / fps):
+                    writer.write_frame(clip.get_frame(t))
+
+    @__render_time
+    def render(self, output_filename: str = f"SE-{time.strftime('%#d-%#m-%Y')}", audio: bool = True, fps: int = None, preset: str = "medium", codec: str = None, threads: int = 2, cache: SegmentCache = None, backend: str = "moviepy", profile: str = None, checkpoint_dir: str = None, chunk_duration: float = 60) -> None:
+        """
+        Render the video.
+
+        With a cache, the video is encoded one clip at a time and the segments of unchanged title cards, slides and end cards
+        are taken from the cache, so after editing one slide only that slide is encoded again.
+
+        With a checkpoint_dir, the video is encoded in chunks that are kept in the directory together with a manifest,
+        so a render that was interrupted picks up after the last finished chunk when it is started again with the same settings.
+
+        Args:
+            output_filename (str, optional): Output filename. Defaults to "SE-{current date}".
+            audio (bool, optional): Include audio. Defaults to True.
+            fps (int, optional): Frames per second. Defaults to the context's fps.
+            preset (str, optional): Encoding preset. Defaults to "medium".
+            codec (str, optional): Video codec. Defaults to None.
+            threads (int, optional): Number of threads for rendering. Defaults to 2.
+            cache (SegmentCache, optional): Reuse segments of unchanged clips from this cache and store the newly encoded ones. The segments are
+                written through the FFmpegPipeWriter whatever the backend. Ignored with a checkpoint_dir. Defaults to None, the context's segment cache.
+            backend (str, optional): "moviepy" to write with write_videofile or "pipe" to write raw frames straight to ffmpeg. Defaults to "moviepy".
+            profile (str, optional): "draft", "balanced" or "archive" to pick the codec, preset and threads from the available encoders,
+                trying codec first. Defaults to None, use the given settings.
+            checkpoint_dir (str, optional): Directory for the chunks and their manifest. The chunks are written through the FFmpegPipeWriter
+                whatever the backend, and removed once the video is done. Defaults to None, render in one go.
+            chunk_duration (float, optional): Length of each chunk in seconds when checkpointing. Defaults to 60.
+        """
+
+        if backend not in ("moviepy", "pipe"):
+            raise ValueError(f"Unknown render backend: {backend}")
+
+        fps = fps or self.__context.fps
+        cache = cache or self.__context.segment_cache
+        ffmpeg_params = None
+        if profile:
+            settings = EncoderProfile.select(profile, os.path.splitext(output_filename)[1] or ".mp4", codec)
+            codec, preset, threads, ffmpeg_params = settings["codec"], settings["preset"], settings["threads"], settings["ffmpeg_params"]
+        ffmpeg_params = (ffmpeg_params or []) + self.__context.ffmpeg_params() or None
+
+        if self.__sub_clip:
+            timeline, bounds = self.__sub_clip, self.__sub_range
+        else:
+            timeline, bounds = self.__final_clip, (0, self.__final_clip.duration)
+
+        RenderProfiler.set_segment(None)
+        soundtrack = self.__soundtrack(timeline, bounds) if audio else None
+        timeline = RenderProfiler.profile_clip(timeline, self.__segment_starts())
+        RenderProfiler.set_segment(None)
+
+        if checkpoint_dir:
+            self.__write_checkpointed(timeline, bounds, output_filename, soundtrack, fps, preset, codec, threads, ffmpeg_params, checkpoint_dir, chunk_duration)
+        elif cache:
+            self.__write_cached(timeline, bounds, output_filename, soundtrack, fps, preset, codec, threads, ffmpeg_params, cache)
+        elif backend == "pipe":
+            RenderClips.__write_pipe(timeline, output_filename, soundtrack, fps, preset, codec, threads, ffmpeg_params)
+        else:
+            timeline = timeline.set_audio(soundtrack)
+            with RenderProfiler.moviepy_encode():
+                timeline.write_videofile(output_filename, audio= soundtrack is not None, fps= fps, preset= preset, codec= codec, threads= threads, ffmpeg_params= ffmpeg_params)
+        RenderProfiler.set_segment(None)
+
+    def __write_checkpointed(self, timeline: VideoClip, bounds: tuple[float, float], output_filename: str, audio_clip: AudioClip | None, fps: int, preset: str, codec: str,
+                             threads: int, ffmpeg_params: list[str], checkpoint_dir: str, chunk_duration: float) -> None:
+        """
+        Write a clip in chunks through the FFmpegPipeWriter, skipping the chunks a previous run already finished, then join them and mux in the audio.
+
+        The manifest is only reused when the chunks, encoder settings and clip fingerprints match. Each chunk is encoded
+        by its own ffmpeg run with the same settings whether or not the render was resumed, so the joined streams are the same.
+
+        Args:
+            timeline (VideoClip): Clip to write.
+            bounds (tuple[float, float]): Start and end of the clip on the whole video.
+            output_filename (str): Output filename.
+            audio_clip (AudioClip | None): Soundtrack to mux in, or None for no audio.
+            fps (int): Frames per second.
+            preset (str): Encoding preset.
+            codec (str): Video codec.
+            threads (int): Number of ffmpeg threads.
+            ffmpeg_params (list[str]): Extra ffmpeg output parameters.
+            checkpoint_dir (str): Directory for the chunks and their manifest.
+            chunk_duration (float): Length of each chunk in seconds.
+        """
+
+        extension = os.path.splitext(output_filename)[1] or ".mp4"
+        ranges = self.__segment_ranges(fps, chunk_duration, bounds)
+        # Clips without a fingerprint can't be checked, so only the layout and settings guard their chunks.
+        key = SegmentCache.fingerprint("checkpoint", ranges, tuple(timeline.size), fps, preset, codec, threads, extension, *(ffmpeg_params or []),
+                                       [fingerprint for _, _, fingerprint, _ in self.__segments])
+
+        os.makedirs(checkpoint_dir, exist_ok= True)
+        manifest_path = os.path.join(checkpoint_dir, "manifest.json")
+        manifest = {"key": key, "chunks": {}}
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as manifest_file:
+                stored = json.load(manifest_file)
+            if stored.get("key") == key:
+                manifest = stored
+            else:
+                print("Checkpoint was written with different settings, rendering from the start.")
+
+        paths = []
+        for index, (start, end) in enumerate(ranges):
+            path = os.path.join(checkpoint_dir, f"chunk{index:05d}{extension}")
+            paths.append(path)
+            done = manifest["chunks"].get(str(index))
+            if done and os.path.isfile(path) and os.path.getsize(path) == done["size"]:
+                continue
+
+            # A chunk only gets its final name once ffmpeg has finished it, so a killed render never leaves a truncated chunk behind.
+            partial_path = os.path.join(checkpoint_dir, f"chunk{index:05d}.partial{extension}")
+            RenderClips.__write_range(timeline, bounds, start, end, partial_path, fps, preset, codec, threads, ffmpeg_params)
+            os.replace(partial_path, path)
+
+            manifest["chunks"][str(index)] = {"start": start, "end": end, "size": os.path.getsize(path)}
+            with open(manifest_path + ".partial", "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent= 2)
+            os.replace(manifest_path + ".partial", manifest_path)
+
+        with tempfile.TemporaryDirectory(dir= os.path.dirname(os.path.abspath(output_filename))) as work_dir:
+            if audio_clip is not None:
+                video_path = os.path.join(work_dir, f"video{extension}")
+                RenderClips._concat_segments(paths, video_path, work_dir)
+                RenderClips._mux_audio(video_path, audio_clip, output_filename, work_dir)
+            else:
+                RenderClips._concat_segments(paths, output_filename, work_dir)
+
+        for path in paths + [manifest_path]:
+            os.remove(path)
+        try:
+            os.rmdir(checkpoint_dir)
+        except OSError:
+            pass
+
+    @__render_time
+    def render_outputs(self, outputs: list[dict], audio: bool = True, threads: int = 2) -> None:
+        """
+        Render several outputs, e.g. 1080p, 720p and a vertical crop, from one compositing pass.
+
+        Each frame is composited once at the resolution of the clips, then cropped and scaled for every output size
+        by a FrameResizer and written to one FFmpegPipeWriter per output. Frames held unchanged by the LayerCompositor
+        are only scaled once. The clips should be built at the largest output resolution.
+
+        Args:
+            outputs (list[dict]): Output specs. "output_filename" is required; "resolution" (defaults to the clips' size),
+                "crop" (x, y, width and height of the source window, defaults to the largest centered window with the output's aspect ratio),
+                "fps" (defaults to the context's fps), "codec", "preset" (defaults to "medium"), "bitrate", "threads" and "profile" are optional.
+            audio (bool, optional): Include audio. Defaults to True.
+            threads (int, optional): Number of ffmpeg threads per output without a "threads" entry. Defaults to 2.
+        """
+
+        if self.__sub_clip:
+            timeline, bounds = self.__sub_clip, self.__sub_range
+        else:
+            timeline, bounds = self.__final_clip, (0, self.__final_clip.duration)
+
+        settings = []
+        for spec in outputs:
+            extension = os.path.splitext(spec["output_filename"])[1] or ".mp4"
+            output = {"codec": spec.get("codec"), "preset": spec.get("preset", "medium"), "threads": spec.get("threads", threads), "ffmpeg_params": None}
+            if spec.get("profile"):
+                # The encoders of all outputs run at once, so they share the CPU cores.
+                output = EncoderProfile.select(spec["profile"], extension, spec.get("codec"), len(outputs))
+            ffmpeg_params = output["ffmpeg_params"] or []
+            if spec.get("bitrate"):
+                # A bitrate replaces the constant quality rate control of the profile.
+                ffmpeg_params = [param for index, param in enumerate(ffmpeg_params)
+                                 if param not in ("-crf", "-cq") and (index == 0 or ffmpeg_params[index - 1] not in ("-crf", "-cq"))]
+                ffmpeg_params += ["-b:v", str(spec["bitrate"])]
+            output["ffmpeg_params"] = ffmpeg_params + self.__context.ffmpeg_params() or None
+            output["fps"] = spec.get("fps") or self.__context.fps
+            output["resizer"] = FrameResizer(timeline.size, spec.get("resolution", timeline.size), spec.get("crop"))
+            settings.append(output)
+
+        # Frame times of every output, so a frame shared by outputs at different frame rates is composited once.
+        frame_times = {}
+        for index, output in enumerate(settings):
+            for t in np.arange(0, timeline.duration, 1.0 / output["fps"]):
+                frame_times.setdefault(round(t * 1e6), (t, []))[1].append(index)
+
+        for index, output in enumerate(settings):
+            output["every_frame"] = all(index in indices for _, indices in frame_times.values())
+
+        RenderProfiler.set_segment(None)
+        soundtrack = self.__soundtrack(timeline, bounds) if audio else None
+        timeline = RenderProfiler.profile_clip(timeline, self.__segment_starts())
+        RenderProfiler.set_segment(None)
+
+        with tempfile.TemporaryDirectory(dir= os.path.dirname(os.path.abspath(outputs[0]["output_filename"]))) as work_dir:
+            audio_path = None
+            if soundtrack is not None:
+                audio_path = os.path.join(work_dir, "audio.wav")
+                AudioMixer.write_wav(soundtrack, audio_path)
+
+            writers = []
+            try:
+                for spec, output in zip(outputs, settings):
+                    writers.append(FFmpegPipeWriter(spec["output_filename"], output["resizer"].size, output["fps"], output["preset"], output["codec"],
+                                                    output["threads"], audio_path, ffmpeg_params= output["ffmpeg_params"]))
+
+                previous, resized = None, {}
+                for _, (t, indices) in sorted(frame_times.items()):
+                    frame = timeline.get_frame(t)
+                    if frame is not previous:
+                        # The LayerCompositor returns the same buffer while nothing changes, so the scaled frames are reused.
+                        previous, resized = frame, {}
+                    for index in indices:
+                        resizer = settings[index]["resizer"]
+                        key = (resizer.size, resizer.crop)
+                        if key not in resized:
+                            resized[key] = resizer.resize(frame)
+                        scaled = resized[key]
+                        if scaled is frame and not settings[index]["every_frame"]:
+                            # Writers hold frames a while, and the compositor reuses its buffers sooner when it composites frames this output skips.
+                            scaled = frame.copy()
+                        writers[index].write_frame(scaled)
+            finally:
+                for writer in writers:
+                    writer.close()
+        RenderProfiler.set_segment(None)
+
+    def __segment_starts(self) -> list[float]:
+        """
+        Get the start times of the clips on the rendered timeline.
+
+        Returns:
+            list[float]: Start time of each clip.
+        """
+
+        offset = self.__sub_range[0] if self.__sub_clip else 0
+
+        return list(np.cumsum([0] + [duration for duration, _, _, _ in self.__segments[:-1]]) - offset)
+
+    def __write_cached(self, timeline: VideoClip, bounds: tuple[float, float], output_filename: str, audio_clip: AudioClip | None, fps: int, preset: str, codec: str,
+                       threads: int, ffmpeg_params: list[str], cache: SegmentCache) -> None:
+        """
+        Write a clip one clip segment at a time, taking unchanged segments from a cache, then join them and mux in the audio.
+
+        Args:
+            timeline (VideoClip): Clip to write.
+            bounds (tuple[float, float]): Start and end of the clip on the whole video.
+            output_filename (str): Output filename.
+            audio_clip (AudioClip | None): Soundtrack to mux in, or None for no audio.
+            fps (int): Frames per second.
+            preset (str): Encoding preset.
+            codec (str): Video codec.
+            threads (int): Number of ffmpeg threads.
+            ffmpeg_params (list[str]): Extra ffmpeg output parameters.
+            cache (SegmentCache): Cache of encoded segments.
+        """
+
+        extension = os.path.splitext(output_filename)[1] or ".mp4"
+
+        with tempfile.TemporaryDirectory(dir= os.path.dirname(os.path.abspath(output_filename))) as work_dir:
+            paths = []
+            for index, (start, end) in enumerate(self.__segment_ranges(fps)):
+                key = self.__segment_key(start, end, fps, preset, codec, extension, ffmpeg_params)
+                path = cache.get(key, extension) if key else None
+                if path is None:
+                    path = os.path.join(work_dir, f"segment{index:05d}{extension}")
+                    RenderClips.__write_range(timeline, bounds, start, end, path, fps, preset, codec, threads, ffmpeg_params)
+                    path = cache.put(key, path, extension) if key else path
+                paths.append(path)
+
+            if audio_clip is not None:
+                video_path = os.path.join(work_dir, f"video{extension}")
+                RenderClips._concat_segments(paths, video_path, work_dir)
+                RenderClips._mux_audio(video_path, audio_clip, output_filename, work_dir)
+            else:
+                RenderClips._concat_segments(paths, output_filename, work_dir)
+
+        cache.evict()
+
+    def __segment_ranges(self, fps: int, chunk_duration: float = None, bounds: tuple[float, float] = None) -> list[tuple[float, float]]:
+        """
+        Split the timeline into segments along clip boundaries or fixed length chunks.
+
+        Boundaries are snapped to the frame grid so that the segments line up when concatenated.
+
+        Args:
+            fps (int): Frames per second.
+            chunk_duration (float, optional): Length of each chunk in seconds. Defaults to None, one segment per clip.
+            bounds (tuple[float, float], optional): Start and end of the part to split. Defaults to None, the sub clip or the whole video.
+
+        Returns:
+            list[tuple[float, float]]: Start and end times of the segments on the rendered timeline.
+        """
+
+        start, end = bounds or (self.__sub_range if self.__sub_clip else (0, self.__final_clip.duration))
+
+        if chunk_duration:
+            boundaries = list(np.arange(start, end, chunk_duration)) + [end]
+        else:
+            clip_ends = np.cumsum([duration for duration, _, _, _ in self.__segments])
+            boundaries = [start] + [clip_end for clip_end in clip_ends if start < clip_end < end] + [end]
+
+        frames = sorted({round((boundary - start) * fps) for boundary in boundaries})
+
+        return [(start + a / fps, start + b / fps) for a, b in zip(frames, frames[1:])]
+
+    def __stream_copy_span(self, start: float, end: float, fps: int, codec: str, extension: str) -> tuple[str, float] | None:
+        """
+        Find the part at the start of a segment that can be stream copied from the source video of a card.
+
+        The source must already match the output codec, pixel format, resolution and frame rate,
+        and the copied part ends on a keyframe so that the rest can be encoded on its own.
+
+        Args:
+            start (float): Start time of the segment.
+            end (float): End time of the segment.
+            fps (int): Frames per second.
+            codec (str): Video codec.
+            extension (str): File extension of the output.
+
+        Returns:
+            tuple[str, float] | None: Path of the source video and duration of the copied part, or None if nothing can be copied.
+        """
+
+        start_frame = round(start * fps)
+
+        clip_start = 0
+        for duration, _, _, span in self.__segments:
+            if round(clip_start * fps) == start_frame:
+                break
+            clip_start += duration
+        else:
+            return None
+        if span is None:
+            return None
+
+        source, span_end = span
+        probe = MediaProbe.probe(source)
+        codec = codec or extensions_dict.get(extension[1:], {}).get("codec", [None])[0]
+        width, height = self.__final_clip.size
+        if (probe is None or probe["codec"] != MediaProbe.codec_name(codec) or probe["pix_fmt"] != "yuv420p"
+                or (probe["width"], probe["height"]) != (width, height) or probe["fps"] != fps):
+            return None
+
+        limit = min(span_end, end - start)
+        cut = max([keyframe for keyframe in MediaProbe.keyframes(source) if keyframe <= limit + 1e-6], default= 0)
+        cut = round(cut * fps) / fps
+
+        return (source, cut) if cut > 0 else None
+
+    def __segment_key(self, start: float, end: float, fps: int, preset: str, codec: str, extension: str, ffmpeg_params: list[str] = None) -> str | None:
+        """
+        Get the cache key of a segment that lies within a single fingerprinted clip.
+
+        Args:
+            start (float): Start time of the segment.
+            end (float): End time of the segment.
+            fps (int): Frames per second.
+            preset (str): Encoding preset.
+            codec (str): Video codec.
+            extension (str): File extension of the segment.
+            ffmpeg_params (list[str], optional): Extra ffmpeg output parameters. Defaults to None.
+
+        Returns:
+            str | None: Key of the segment, or None if it can't be cached.
+        """
+
+        start_frame, end_frame = round(start * fps), round(end * fps)
+
+        clip_start = 0
+        for duration, _, fingerprint, _ in self.__segments:
+            clip_start_frame, clip_end_frame = round(clip_start * fps), round((clip_start + duration) * fps)
+            if clip_start_frame <= start_frame and end_frame <= clip_end_frame:
+                if fingerprint is None:
+                    return None
+                return SegmentCache.fingerprint(fingerprint, start_frame - clip_start_frame, end_frame - clip_start_frame, fps, preset, codec, extension, *(ffmpeg_params or []))
+            clip_start += duration
+
+        return None
+
+    @staticmethod
+    def _reset_readers() -> None:
+        """
+        Detach the video and audio readers inherited from the parent process.
+
+        A forked worker shares the parent's ffmpeg pipes. It closes its copies, so
+        an ffmpeg process the parent closes isn't left blocked on a pipe the worker
+        still holds, and every video reader opens its own process on the next frame
+        request instead. Workers only render video, so audio readers stay detached.
+        """
+
+        for obj in gc.get_objects():
+            if isinstance(obj, (FFMPEG_VideoReader, FFMPEG_AudioReader)) and getattr(obj, "proc", None) is not None:
+                for pipe in (obj.proc.stdin, obj.proc.stdout, obj.proc.stderr):
+                    if pipe is not None:
+                        pipe.close()
+                obj.proc = None
+
+    @staticmethod
+    def _init_process(timeline: VideoClip) -> None:
+        """
+        Give a forked worker process the timeline it renders segments of.
+
+        The timeline is handed over through fork rather than pickled, so each render_parallel call keeps its own.
+
+        Args:
+            timeline (VideoClip): Whole timeline of the render.
+        """
+
+        RenderClips._reset_readers()
+        RenderClips.__worker.timeline = timeline
+
+    @staticmethod
+    def _init_thread(timeline: VideoClip | list[tuple[float, Callable]]) -> None:
+        """
+        Give a worker thread the timeline it renders segments of.
+
+        Clips hold stateful video readers and compositor buffers, so threads can't share them. Each thread builds its own
+        streaming timeline from the clip factories, and a built timeline is only ever given to a single thread.
+
+        Args:
+            timeline (VideoClip | list[tuple[float, Callable]]): Whole timeline of the render, or the duration and factory of each clip.
+        """
+
+        RenderClips.__worker.timeline = StreamingClip(timeline) if isinstance(timeline, list) else timeline
+
+    @staticmethod
+    def __can_fork() -> bool:
+        """
+        Check whether the render workers can be forked safely.
+
+        A forked process only copies the calling thread, so a lock another thread holds at that moment stays locked
+        forever in the worker. Fork is only used while no other thread runs, apart from the monitor thread moviepy's
+        progress bars leave behind, which only touches progress bars.
+
+        Returns:
+            bool: True if fork is available and no other thread runs.
+        """
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return False
+
+        return all(thread is threading.current_thread() or isinstance(thread, TMonitor) for thread in threading.enumerate())
+
+    @staticmethod
+    def __write_range(timeline: VideoClip, bounds: tuple[float, float], start: float, end: float, path: str, fps: int, preset: str, codec: str, threads: int, ffmpeg_params: list[str]) -> None:
+        """
+        Write the frames of a segment of a clip without audio through the FFmpegPipeWriter, taken by index on the frame grid.
+
+        Args:
+            timeline (VideoClip): Clip to write from.
+            bounds (tuple[float, float]): Start and end of the clip on the whole video.
+            start (float): Start time of the segment on the whole video.
+            end (float): End time of the segment on the whole video.
+            path (str): Path of the segment.
+            fps (int): Frames per second.
+            preset (str): Encoding preset.
+            codec (str): Video codec.
+            threads (int): Number of ffmpeg threads.
+            ffmpeg_params (list[str]): Extra ffmpeg output parameters.
+        """
+
+        with FFmpegPipeWriter(path, timeline.size, fps, preset, codec, threads, ffmpeg_params= ffmpeg_params) as writer:
+            for frame_index in range(round((start - bounds[0]) * fps), round((end - bounds[0]) * fps)):
+                writer.write_frame(timeline.get_frame(frame_index / fps))
+
+    @staticmethod
+    def _render_segment(start: float, end: float, path: str, fps: int, preset: str, codec: str, threads: int, ffmpeg_params: list[str] = None) -> str:
+        """
+        Render a segment of the timeline of the worker to an intermediate file without audio.
+
+        Args:
+            start (float): Start time of the segment.
+            end (float): End time of the segment.
+            path (str): Path of the intermediate file.
+            fps (int): Frames per second.
+            preset (str): Encoding preset.
+            codec (str): Video codec.
+            threads (int): Number of ffmpeg threads.
+            ffmpeg_params (list[str], optional): Extra ffmpeg output parameters. Defaults to None.
+
+        Returns:
+            str: Path of the intermediate file.
+        """
+
+        timeline = RenderClips.__worker.timeline
+        # Frames are taken by index on the whole timeline, so the segments hold exactly the frames of a single render between them.
+        RenderClips.__write_range(timeline, (0, timeline.duration), start, end, path, fps, preset, codec, threads, ffmpeg_params)
+
+        return path
+
+    @staticmethod
+    def _ffmpeg(*args: str) -> None:
+        """
+        Run ffmpeg with the given arguments.
+
+        Args:
+            *args (str): Arguments passed to ffmpeg.
+        """
+
+        subprocess.run([get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", *args], check= True)
+
+    @staticmethod
+    def _concat_segments(paths: list[str], output_filename: str, work_dir: str) -> None:
+        """
+        Join encoded segments with the ffmpeg concat demuxer without re-encoding.
+
+        Args:
+            paths (list[str]): Paths of the segments in playback order.
+            output_filename (str): Output filename.
+            work_dir (str): Directory for the concat list.
+        """
+
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w") as segment_list:
+            for path in paths:
+                segment_list.write(f"file '{os.path.abspath(path)}'\n")
+
+        RenderClips._ffmpeg("-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_filename)
+
+    @staticmethod
+    def _mux_audio(video_path: str, audio_clip: AudioClip, output_filename: str, work_dir: str) -> None:
+        """
+        Mux an audio clip into an already encoded video without re-encoding the video stream.
+
+        Args:
+            video_path (str): Path of the video without audio.
+            audio_clip (AudioClip): Audio to add.
+            output_filename (str): Output filename.
+            work_dir (str): Directory for the intermediate audio file.
+        """
+
+        audio_path = os.path.join(work_dir, "audio.wav")
+        AudioMixer.write_wav(audio_clip, audio_path)
+
+        audio_codec = "libvorbis" if os.path.splitext(output_filename)[1][1:] in ("ogv", "webm") else "libmp3lame"
+        RenderClips._ffmpeg("-i", video_path, "-i", audio_path, "-map", "0:v", "-map", "1:a", "-c:v", "copy", "-c:a", audio_codec, output_filename)
+
+    @__render_time
+    def render_parallel(self, output_filename: str = f"SE-{time.strftime('%#d-%#m-%Y')}", workers: int = None, audio: bool = True, fps: int = None, preset: str = "medium", codec: str = None, threads: int = 1, chunk_duration: float = None, cache: SegmentCache = None, stream_copy: bool = False, profile: str = None) -> None:
+        """
+        Render the video in segments across a process pool and join them without re-encoding.
+
+        Where processes can't be forked safely, e.g. on Windows or while other threads run, the segments are rendered in threads
+        instead. Each thread builds its own clips from the clip factories of a RenderClips made with stream=True, otherwise the
+        segments are rendered one at a time in a single thread.
+
+        Args:
+            output_filename (str, optional): Output filename. Defaults to "SE-{current date}".
+            workers (int, optional): Number of worker processes. Defaults to the number of CPU cores.
+            audio (bool, optional): Include audio. Defaults to True.
+            fps (int, optional): Frames per second. Defaults to the context's fps.
+            preset (str, optional): Encoding preset. Defaults to "medium".
+            codec (str, optional): Video codec. Defaults to None.
+            threads (int, optional): Number of ffmpeg threads per worker. Defaults to 1.
+            chunk_duration (float, optional): Render fixed length chunks instead of one segment per clip. Defaults to None.
+            cache (SegmentCache, optional): Reuse segments of unchanged clips from this cache and store the newly encoded ones. Defaults to None, the context's segment cache.
+            stream_copy (bool, optional): Copy the start of title and end cards that has no text straight from their source video when it already matches the output format. Defaults to False.
+            profile (str, optional): "draft", "balanced" or "archive" to pick the codec, preset and threads per worker from the available encoders,
+                trying codec first. Defaults to None, use the given settings.
+        """
+
+        timeline = self.__sub_clip if self.__sub_clip else self.__final_clip
+        extension = os.path.splitext(output_filename)[1] or ".mp4"
+
+        fps = fps or self.__context.fps
+        cache = cache or self.__context.segment_cache
+        ffmpeg_params = None
+        if profile:
+            settings = EncoderProfile.select(profile, extension, codec, workers or os.cpu_count())
+            codec, preset, threads, ffmpeg_params = settings["codec"], settings["preset"], settings["threads"], settings["ffmpeg_params"]
+        ffmpeg_params = (ffmpeg_params or []) + self.__context.ffmpeg_params() or None
+
+        ranges = []
+        for start, end in self.__segment_ranges(fps, chunk_duration):
+            span = self.__stream_copy_span(start, end, fps, codec, extension) if stream_copy else None
+            if span:
+                ranges.append((start, start + span[1], span[0]))
+                start += span[1]
+            if round(start * fps) < round(end * fps):
+                ranges.append((start, end, None))
+
+        # Workers inherit the timeline through fork as clips with position lambdas can't be pickled.
+        # Without fork the segments are rendered in threads, which still overlaps the ffmpeg encoders.
+        # Built clips' video readers can't be shared between threads, so only a streaming render gets more than one.
+        if RenderClips.__can_fork():
+            executor = ProcessPoolExecutor(workers, mp_context= multiprocessing.get_context("fork"), initializer= RenderClips._init_process, initargs= (self.__final_clip,))
+        elif all(factory is not None for _, factory, _, _ in self.__segments):
+            executor = ThreadPoolExecutor(workers or os.cpu_count(), initializer= RenderClips._init_thread, initargs= ([(duration, factory) for duration, factory, _, _ in self.__segments],))
+        else:
+            executor = ThreadPoolExecutor(1, initializer= RenderClips._init_thread, initargs= (self.__final_clip,))
+
+        with tempfile.TemporaryDirectory(dir= os.path.dirname(os.path.abspath(output_filename))) as work_dir:
+            keys = [self.__segment_key(start, end, fps, preset, codec, extension, ffmpeg_params) if cache and not source else None for start, end, source in ranges]
+            paths = [cache.get(key, extension) if key else None for key in keys]
+
+            for index, (start, end, source) in enumerate(ranges):
+                if source:
+                    # The segment muxer cuts on the keyframe itself, so exactly the frames before it are copied.
+                    pattern = os.path.join(work_dir, f"segment{index:05d}-%d{extension}")
+                    RenderClips._ffmpeg("-i", source, "-map", "0:v:0", "-c", "copy", "-an", "-f", "segment", "-segment_times", f"{end - start:.06f}", "-reset_timestamps", "1", pattern)
+                    paths[index] = pattern.replace("%d", "0")
+
+            with executor:
+                futures = {index: executor.submit(RenderClips._render_segment, start, end, os.path.join(work_dir, f"segment{index:05d}{extension}"), fps, preset, codec, threads, ffmpeg_params)
+                           for index, (start, end, _) in enumerate(ranges) if not paths[index]}
+                # The soundtrack's files are decoded while the workers encode.
+                soundtrack = self.__soundtrack(timeline, self.__sub_range if self.__sub_clip else (0, self.__final_clip.duration)) if audio else None
+                for index, future in futures.items():
+                    paths[index] = cache.put(keys[index], future.result(), extension) if keys[index] else future.result()
+
+            if soundtrack is not None:
+                video_path = os.path.join(work_dir, f"video{extension}")
+                RenderClips._concat_segments(paths, video_path, work_dir)
+                RenderClips._mux_audio(video_path, soundtrack, output_filename, work_dir)
+            else:
+                RenderClips._concat_segments(paths, output_filename, work_dir)
+
+        if cache:
+            cache.evict()
+
+    @__render_time
+    def preview(self, output_filename: str = "preview.mp4", scale: float = 0.25, fps: int = 12, start: float = None, end: float = None, audio: bool = True, cache: SegmentCache = None, contact_sheet: bool = False) -> None:
+        """
+        Render a quick low resolution, low frame rate proxy of the video, or a contact sheet with one thumbnail per clip.
+
+        Only the frames at the preview frame rate are composited. A FrameResizer scales them down before they are piped to ffmpeg, which encodes them with the draft profile.
+        With a cache, the proxies of unchanged title cards, slides and end cards are reused.
+
+        Args:
+            output_filename (str, optional): Output filename, an image when contact_sheet is set. Defaults to "preview.mp4".
+            scale (float, optional): Fraction of the resolution. Defaults to 0.25.
+            fps (int, optional): Frames per second. Defaults to 12.
+            start (float, optional): Start time of the preview. Defaults to None, the start of the sub clip or the video.
+            end (float, optional): End time of the preview. Defaults to None, the end of the sub clip or the video.
+            audio (bool, optional): Include audio. Defaults to True.
+            cache (SegmentCache, optional): Reuse proxies of unchanged clips from this cache and store the newly encoded ones. Defaults to None, the context's segment cache.
+            contact_sheet (bool, optional): Write a grid of thumbnails, one from the middle of each clip, instead of a video. Defaults to False.
+        """
+
+        cache = cache or self.__context.segment_cache
+        first, last = self.__sub_range if self.__sub_clip else (0, self.__final_clip.duration)
+        bounds = (first if start is None else max(0, start), last if end is None else min(self.__final_clip.duration, end))
+        width, height = (max(2, int(dim * scale) // 2 * 2) for dim in self.__final_clip.size)
+
+        if contact_sheet:
+            ranges = self.__segment_ranges(fps, bounds= bounds)
+            columns = int(np.ceil(np.sqrt(len(ranges))))
+            sheet = Image.new("RGB", (columns * width, int(np.ceil(len(ranges) / columns)) * height))
+            for index, (clip_start, clip_end) in enumerate(ranges):
+                thumbnail = Image.fromarray(self.__final_clip.get_frame((clip_start + clip_end) / 2).astype(np.uint8)).resize((width, height), Image.BILINEAR)
+                sheet.paste(thumbnail, (index % columns * width, index // columns * height))
+            sheet.save(output_filename)
+            return
+
+        extension = os.path.splitext(output_filename)[1] or ".mp4"
+        settings = EncoderProfile.select("draft", extension)
+        # Frames are scaled down before they are piped, so ffmpeg only ever sees proxy sized frames.
+        resizer = FrameResizer(self.__final_clip.size, (width, height), (0, 0, *self.__final_clip.size))
+
+        with tempfile.TemporaryDirectory(dir= os.path.dirname(os.path.abspath(output_filename))) as work_dir:
+            paths = []
+            for index, (segment_start, segment_end) in enumerate(self.__segment_ranges(fps, bounds= bounds)):
+                key = self.__segment_key(segment_start, segment_end, fps, settings["preset"], settings["codec"], extension, [*(settings["ffmpeg_params"] or []), f"{width}x{height}"]) if cache else None
+                path = cache.get(key, extension) if key else None
+                if path is None:
+                    path = os.path.join(work_dir, f"proxy{index:05d}{extension}")
+                    with FFmpegPipeWriter(path, (width, height), fps, settings["preset"], settings["codec"], settings["threads"], ffmpeg_params= settings["ffmpeg_params"]) as writer:
+                        for frame in range(round((segment_end - segment_start) * fps)):
+                            writer.write_frame(resizer.resize(self.__final_clip.get_frame(segment_start + frame / fps)))
+                    path = cache.put(key, path, extension) if key else path
+                paths.append(path)
+
+            soundtrack = self.__soundtrack(self.__final_clip.subclip(*bounds), bounds, absolute= True) if audio else None
+            if soundtrack is not None:
+                video_path = os.path.join(work_dir, f"video{extension}")
+                RenderClips._concat_segments(paths, video_path, work_dir)
+                RenderClips._mux_audio(video_path, soundtrack, output_filename, work_dir)
+            else:
+                RenderClips._concat_segments(paths, output_filename, work_dir)
+
+        if cache:
+            cache.evict()
+
+
+
+class BatchRenderer:
+    """
+    A class to render many decks on a persistent pool of worker processes.
+    """
+
+    def __init__(self, workers: int = None):
+        self.__workers = workers or os.cpu_count()
+        # Workers are spawned on demand and reused, so imports and the text and asset caches stay warm across jobs.
+        # Each runs one job at a time, so a running job can be cancelled by stopping its worker.
+        self.__mp_context = multiprocessing.get_context("spawn")
+        self.__idle = []
+        self.__busy = {}
+        self.__jobs = {}
+        self.__pending = []
+        self.__running = 0
+        self.__condition = threading.Condition()
+
+    @staticmethod
+    def load_manifest(path: str) -> list[dict]:
+        """
+        Load the decks of a JSON or YAML manifest.
+
+        Args:
+            path (str): Path to the manifest.
+
+        Returns:
+            list[dict]: Deck descriptions.
+        """
+
+        with open(path) as manifest_file:
+            if path.endswith((".yaml", ".yml")):
+                if yaml is None:
+                    raise ImportError("PyYAML is required to read YAML manifests.")
+                manifest = yaml.safe_load(manifest_file)
+            else:
+                manifest = json.load(manifest_file)
+
+        return manifest["decks"] if isinstance(manifest, dict) and "decks" in manifest else manifest
+
+    @staticmethod
+    def build(deck: dict) -> RenderClips:
+        """
+        Build the RenderClips of a deck description.
+
+        Args:
+            deck (dict): Deck description with "resolution", "title_card", "slides", "end_card" and "audio" entries,
+                and optional "color_depth" and "text_backend" entries.
+
+        Returns:
+            RenderClips: Streaming render of the deck.
+        """
+
+        context = RenderContext(*deck["resolution"], color_depth= deck.get("color_depth", 8), text_backend= deck.get("text_backend"))
+
+        items = []
+        if "title_card" in deck:
+            items.append(BatchRenderer.__add_content(TitleCard(deck["title_card"]["video"], deck["title_card"]["duration"], context), deck["title_card"]))
+        for slide in deck.get("slides", []):
+            items.append(BatchRenderer.__add_content(Slide(slide["image"], slide["duration"], context), slide))
+        if "end_card" in deck:
+            items.append(BatchRenderer.__add_content(EndCard(deck["end_card"]["video"], deck["end_card"]["duration"], context), deck["end_card"]))
+
+        return BatchRenderer.__add_content(RenderClips(items, stream= True, context= context), deck)
+
+    @staticmethod
+    def __add_content(item: Audio, description: dict) -> Audio:
+        """
+        Add the texts and audio of a description to a card, slide or render.
+
+        Args:
+            item (Audio): Card, slide or render.
+            description (dict): Description with optional "texts" and "audio" lists of add_text and add_audio arguments.
+
+        Returns:
+            Audio: The item.
+        """
+
+        for text in description.get("texts", []):
+            item.add_text(**text)
+        for audio in description.get("audio", []):
+            item.add_audio(**audio)
+
+        return item
+
+    @staticmethod
+    def _worker_loop(connection) -> None:
+        """
+        Render the decks sent over a connection one at a time until None is sent.
+
+        Args:
+            connection (Connection): Worker end of the pipe to the BatchRenderer.
+        """
+
+        while True:
+            deck = connection.recv()
+            if deck is None:
+                return
+            try:
+                outcome = ("done", BatchRenderer._run_job(deck))
+            except Exception as error:
+                outcome = ("failed", repr(error))
+            connection.send(outcome)
+
+    @staticmethod
+    def _run_job(deck: dict) -> dict:
+        """
+        Build and render a deck in a worker process.
+
+        Args:
+            deck (dict): Deck description. Its "render" entry holds the arguments of render, or of render_parallel with "method": "render_parallel".
+
+        Returns:
+            dict: Output filename and render time.
+        """
+
+        start = timer()
+        options = dict(deck.get("render", {}))
+        method = options.pop("method", "render")
+        if method not in ("render", "render_parallel"):
+            raise ValueError(f"Unknown render method: {method}")
+
+        getattr(BatchRenderer.build(deck), method)(**options)
+
+        return {"output": options.get("output_filename"), "seconds": timer() - start}
+
+    def submit(self, deck: dict) -> str:
+        """
+        Queue a deck for rendering.
+
+        Args:
+            deck (dict): Deck description, with an optional "id" and "retries" count.
+
+        Returns:
+            str: Id of the job.
+        """
+
+        return self.submit_all([deck])[0]
+
+    def submit_all(self, decks: list[dict]) -> list[str]:
+        """
+        Queue several decks for rendering, either all of them or none.
+
+        Args:
+            decks (list[dict]): Deck descriptions, each with an optional "id" and "retries" count.
+
+        Returns:
+            list[str]: Ids of the jobs.
+
+        Raises:
+            TypeError: If a deck isn't a dict.
+            ValueError: If an id is used twice or by a job that is still queued or running, or a retries count isn't a number.
+        """
+
+        if not all(isinstance(deck, dict) for deck in decks):
+            raise TypeError("Each deck must be a dict")
+        job_ids = [str(deck.get("id") or uuid.uuid4().hex[:12]) for deck in decks]
+        retries = [int(deck.get("retries", 0)) for deck in decks]
+
+        with self.__condition:
+            for index, job_id in enumerate(job_ids):
+                if job_id in job_ids[:index] or (job_id in self.__jobs and self.__jobs[job_id]["status"] in ("queued", "running")):
+                    raise ValueError(f"Job {job_id} is already queued")
+
+            for job_id, deck, retry_count in zip(job_ids, decks, retries):
+                self.__jobs[job_id] = {"status": "queued", "attempts": 0, "retries": retry_count, "result": None, "error": None, "deck": deck}
+                self.__pending.append(job_id)
+            self.__dispatch()
+
+        return job_ids
+
+    def __dispatch(self) -> None:
+        """
+        Hand queued jobs to the pool while workers are free. Must be called with the lock held.
+
+        Jobs are only submitted when a worker can start them right away, so queued jobs can still be cancelled.
+        """
+
+        while self.__pending and self.__running < self.__workers:
+            job_id = self.__pending.pop(0)
+            job = self.__jobs[job_id]
+            job["status"] = "running"
+            job["attempts"] += 1
+            self.__running += 1
+            worker = None
+            try:
+                worker = self.__idle.pop() if self.__idle else self.__start_worker()
+                self.__busy[job_id] = worker
+                worker["connection"].send(job["deck"])
+            except (OSError, ValueError, EOFError) as error:
+                # The worker couldn't be started or died while idle; the attempt fails like any other.
+                # Closing the connection makes a worker that is still alive exit, so it isn't left unreachable.
+                self.__busy.pop(job_id, None)
+                if worker is not None:
+                    worker["connection"].close()
+                self.__record(job_id, ("failed", repr(error)))
+                continue
+            threading.Thread(target= self.__watch, args= (job_id, worker), daemon= True).start()
+
+    def __start_worker(self) -> dict:
+        """
+        Start a worker process. Must be called with the lock held.
+
+        Returns:
+            dict: Process and connection of the worker.
+        """
+
+        connection, worker_connection = self.__mp_context.Pipe()
+        process = self.__mp_context.Process(target= BatchRenderer._worker_loop, args= (worker_connection,), daemon= True)
+        process.start()
+        # Only the worker holds its end now, so reading raises EOFError as soon as the worker dies.
+        worker_connection.close()
+
+        return {"process": process, "connection": connection}
+
+    def __watch(self, job_id: str, worker: dict) -> None:
+        """
+        Wait for the outcome of a job attempt on a worker, which is lost if the worker dies or is stopped.
+
+        Args:
+            job_id (str): Id of the job.
+            worker (dict): Worker running the job.
+        """
+
+        try:
+            outcome = worker["connection"].recv()
+        except (EOFError, OSError):
+            worker["process"].join()
+            outcome = None
+
+        with self.__condition:
+            self.__busy.pop(job_id, None)
+            if outcome is None or worker.get("stopped"):
+                worker["connection"].close()
+            else:
+                self.__idle.append(worker)
+            if outcome is None:
+                outcome = ("failed", f"Worker exited with code {worker['process'].exitcode}")
+            self.__record(job_id, outcome)
+            self.__dispatch()
+
+    def __record(self, job_id: str, outcome: tuple[str, object]) -> None:
+        """
+        Record the outcome of a job attempt, queueing failed attempts again while retries are left. Must be called with the lock held.
+
+        Args:
+            job_id (str): Id of the job.
+            outcome (tuple[str, object]): "done" and the result, or "failed" and the error.
+        """
+
+        self.__running -= 1
+        job = self.__jobs[job_id]
+        state, value = outcome
+        if job["status"] == "cancelled":
+            pass
+        elif state == "failed":
+            job["error"] = value
+            if job["attempts"] <= job["retries"]:
+                job["status"] = "queued"
+                self.__pending.append(job_id)
+            else:
+                job["status"] = "failed"
+        else:
+            job["status"] = "done"
+            job["result"] = value
+
+        self.__condition.notify_all()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued job, or stop a running one by terminating its worker.
+
+        Args:
+            job_id (str): Id of the job.
+
+        Returns:
+            bool: True if the job was cancelled.
+        """
+
+        with self.__condition:
+            if job_id in self.__pending:
+                self.__pending.remove(job_id)
+            elif job_id in self.__busy and self.__jobs[job_id]["status"] == "running":
+                # The watcher of the job sees the worker die, drops it and frees its slot.
+                self.__busy[job_id]["stopped"] = True
+                self.__busy[job_id]["process"].terminate()
+            else:
+                return False
+            self.__jobs[job_id]["status"] = "cancelled"
+            self.__condition.notify_all()
+
+        return True
+
+    def status(self, job_id: str = None) -> dict:
+        """
+        Get the status of one job or of every job.
+
+        Args:
+            job_id (str, optional): Id of the job. Defaults to None, every job.
+
+        Returns:
+            dict: Status, attempts, result and last error of the job, or of every job by id.
+        """
+
+        with self.__condition:
+            summaries = {job_id: {key: job[key] for key in ("status", "attempts", "result", "error")} for job_id, job in self.__jobs.items()}
+
+        return summaries if job_id is None else summaries.get(job_id)
+
+    def wait(self) -> dict:
+        """
+        Wait until every job is done, failed or cancelled.
+
+        Returns:
+            dict: Status of every job by id.
+        """
+
+        with self.__condition:
+            self.__condition.wait_for(lambda: not self.__pending and not self.__running)
+
+        return self.status()
+
+    def shutdown(self) -> None:
+        """
+        Cancel the queued jobs and stop the workers once the running ones finish.
+        """
+
+        with self.__condition:
+            for job_id in list(self.__pending):
+                self.cancel(job_id)
+            self.__condition.wait_for(lambda: not self.__running)
+            workers, self.__idle = self.__idle, []
+
+        for worker in workers:
+            try:
+                worker["connection"].send(None)
+            except OSError:
+                pass
+            worker["process"].join()
+            worker["connection"].close()
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """
+        Serve the job queue over HTTP until interrupted.
+
+        POST /jobs queues a deck or a manifest of decks, GET /jobs and GET /jobs/<id> return job status
+        and DELETE /jobs/<id> cancels a job.
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on. Defaults to 8000.
+        """
+
+        renderer = self
+
+        class JobHandler(BaseHTTPRequestHandler):
+            def __reply(self, code: int, body) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def __job_id(self) -> str | None:
+                parts = self.path.strip("/").split("/")
+                return parts[1] if len(parts) == 2 and parts[0] == "jobs" else None
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/jobs":
+                    return self.__reply(404, {"error": "not found"})
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    decks = body["decks"] if isinstance(body, dict) and "decks" in body else body if isinstance(body, list) else [body]
+                    self.__reply(202, {"jobs": renderer.submit_all(decks)})
+                except (ValueError, KeyError, TypeError) as error:
+                    self.__reply(400, {"error": str(error)})
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/jobs":
+                    return self.__reply(200, renderer.status())
+                job = renderer.status(self.__job_id()) if self.__job_id() else None
+                self.__reply(200 if job else 404, job or {"error": "not found"})
+
+            def do_DELETE(self):
+                job_id = self.__job_id()
+                if job_id is None or renderer.status(job_id) is None:
+                    return self.__reply(404, {"error": "not found"})
+                self.__reply(200, {"cancelled": renderer.cancel(job_id)})
+
+        server = ThreadingHTTPServer((host, port), JobHandler)
+        print(f"Serving render jobs on http://{host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description= "Render Slides2Video decks in batch.")
+    subparsers = parser.add_subparsers(dest= "command", required= True)
+
+    batch_parser = subparsers.add_parser("batch", help= "render every deck of a JSON or YAML manifest")
+    batch_parser.add_argument("manifest")
+    batch_parser.add_argument("--workers", type= int, default= None)
+
+    serve_parser = subparsers.add_parser("serve", help= "accept render jobs over HTTP")
+    serve_parser.add_argument("--host", default= "127.0.0.1")
+    serve_parser.add_argument("--port", type= int, default= 8000)
+    serve_parser.add_argument("--workers", type= int, default= None)
+
+    args = parser.parse_args()
+    renderer = BatchRenderer(args.workers)
+
+    try:
+        if args.command == "batch":
+            renderer.submit_all(BatchRenderer.load_manifest(args.manifest))
+            statuses = renderer.wait()
+            print(json.dumps(statuses, indent= 2))
+            if any(job["status"] != "done" for job in statuses.values()):
+                sys.exit(1)
+        else:
+            renderer.serve(args.host, args.port)
+    finally:
+        renderer.shutdown()
+
+
+if __name__ == "__main__":
+    main()
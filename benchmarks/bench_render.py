@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer as timer
+
+import numpy as np
+from moviepy.config import get_setting
+from PIL import Image, ImageFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Slides2Video import *
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def ffmpeg(*args: str) -> None:
+    """
+    Run ffmpeg with the given arguments.
+
+    Args:
+        *args (str): Arguments passed to ffmpeg.
+    """
+
+    subprocess.run([get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", *args], check= True)
+
+
+def make_assets(asset_dir: str, slides: int, width: int, height: int, fps: int, card_duration: int) -> dict:
+    """
+    Generate the synthetic images, videos and audio of a deck.
+
+    Args:
+        asset_dir (str): Directory to write the assets to.
+        slides (int): Number of slide images.
+        width (int): Width of the images and videos.
+        height (int): Height of the images and videos.
+        fps (int): Frame rate of the videos.
+        card_duration (int): Duration of the title and end card videos.
+
+    Returns:
+        dict: Paths of the generated assets.
+    """
+
+    rng = np.random.default_rng(0)
+    images = []
+    for index in range(slides):
+        gradient = np.linspace(0, 255, width, dtype= np.float32)[None, :, None] * rng.random(3, dtype= np.float32)
+        img = np.broadcast_to(gradient, (height, width, 3)).astype(np.uint8)
+        path = os.path.join(asset_dir, f"slide{index:04d}.jpg")
+        Image.fromarray(img).save(path, quality= 90)
+        images.append(path)
+
+    text_bg = os.path.join(asset_dir, "txt_bg.png")
+    Image.new("RGBA", (200, 80), (20, 20, 20, 200)).save(text_bg)
+
+    videos = {}
+    for name, source in (("intro", "testsrc"), ("end", "smptebars")):
+        videos[name] = os.path.join(asset_dir, f"{name}.mp4")
+        ffmpeg("-f", "lavfi", "-i", f"{source}=size={width}x{height}:rate={fps}", "-f", "lavfi", "-i", "sine=frequency=330",
+               "-t", str(card_duration), "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", videos[name])
+
+    music = os.path.join(asset_dir, "music.wav")
+    ffmpeg("-f", "lavfi", "-i", "sine=frequency=220:duration=600", music)
+
+    return {"images": images, "text_bg": text_bg, "music": music, **videos}
+
+
+def build_deck(assets: dict, font: str, captions: int, slide_duration: int, card_duration: int, compositor: bool) -> list:
+    """
+    Build the clips of the deck.
+
+    Args:
+        assets (dict): Paths of the generated assets.
+        font (str): Font of the text.
+        captions (int): Number of captions per slide.
+        slide_duration (int): Duration of each slide.
+        card_duration (int): Duration of the title and end cards.
+        compositor (bool): Build the clips with the LayerCompositor.
+
+    Returns:
+        list: Title card, slide and end card clips.
+    """
+
+    title_card = TitleCard(assets["intro"], card_duration)
+    title_card.add_text("Benchmark deck", 100, font, 60)
+    title_card.add_text("synthetic", 200, font, 40, start= 1)
+    clips = [title_card.make_title_card(compositor= compositor)]
+
+    for index, image in enumerate(assets["images"]):
+        slide = Slide(image, slide_duration)
+        for caption in range(captions):
+            slide.add_text(f"Slide {index} caption {caption}", (0, 40 + 90 * caption), font, 32, assets["text_bg"], direction= ("right", "left")[caption % 2])
+        clips.append(slide.make_slide(compositor= compositor))
+
+    end_card = EndCard(assets["end"], card_duration)
+    end_card.add_text("The end", 100, font, 60)
+    clips.append(end_card.make_end_card(compositor= compositor))
+
+    return clips
+
+
+def peak_rss() -> int | None:
+    """
+    Get the peak resident memory of the process.
+
+    Returns:
+        int | None: Peak memory in bytes, or None where it can't be measured.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Generate the deck, then time building, setting up and rendering it.
+
+    Args:
+        args (argparse.Namespace): Benchmark options.
+
+    Returns:
+        dict: Benchmark results.
+    """
+
+    Resolution.set_resolution(args.width, args.height)
+    TextCache.configure(backend= "pillow")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        assets = make_assets(work_dir, args.slides, args.width, args.height, args.fps, args.card_duration)
+
+        start = timer()
+        clips = build_deck(assets, args.font, args.captions, args.slide_duration, args.card_duration, args.compositor)
+        build_seconds = timer() - start
+
+        start = timer()
+        render_clips = RenderClips(clips)
+        render_clips.add_audio(assets["music"], 0, 5, 1.0, 0)
+        render_clips.add_audio(assets["music"], 5, 60, 0.5, 5)
+        setup_seconds = timer() - start
+
+        video_seconds = 2 * args.card_duration + args.slides * args.slide_duration
+        start = timer()
+        if args.workers:
+            render_clips.render_parallel(os.path.join(work_dir, "out.mp4"), workers= args.workers, fps= args.fps, preset= args.preset, profile= args.profile)
+        else:
+            render_clips.render(os.path.join(work_dir, "out.mp4"), fps= args.fps, preset= args.preset, backend= args.backend, profile= args.profile)
+        render_seconds = timer() - start
+
+    return {
+        "config": {key: value for key, value in vars(args).items() if key not in ("baseline", "update_baseline", "tolerance")},
+        "build_seconds": build_seconds,
+        "setup_seconds": setup_seconds,
+        "render_seconds": render_seconds,
+        "frames_per_second": video_seconds * args.fps / render_seconds,
+        "realtime_factor": video_seconds / render_seconds,
+        "peak_rss_bytes": peak_rss(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Compare the results with a stored baseline and print the differences.
+
+    Args:
+        results (dict): Benchmark results.
+        baseline (dict): Stored baseline results.
+        tolerance (float): Allowed relative throughput drop.
+
+    Returns:
+        bool: True if the throughput didn't drop more than the tolerance.
+    """
+
+    if baseline.get("config") != results["config"]:
+        print("Baseline was recorded with a different configuration, skipping the comparison.")
+        return True
+
+    passed = True
+    for metric in ("frames_per_second", "realtime_factor"):
+        change = results[metric] / baseline[metric] - 1
+        print(f"{metric}: {results[metric]:.2f} (baseline {baseline[metric]:.2f}, {change:+.1%})")
+        passed &= change >= -tolerance
+
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description= "Benchmark rendering of a synthetic Slides2Video deck.")
+    parser.add_argument("--slides", type= int, default= 20)
+    parser.add_argument("--captions", type= int, default= 2)
+    parser.add_argument("--width", type= int, default= 1280)
+    parser.add_argument("--height", type= int, default= 720)
+    parser.add_argument("--fps", type= int, default= 24)
+    parser.add_argument("--slide-duration", type= int, default= 2)
+    parser.add_argument("--card-duration", type= int, default= 3)
+    parser.add_argument("--preset", default= "ultrafast")
+    parser.add_argument("--font", default= "DejaVuSans", help= "TrueType font name or path for the text")
+    parser.add_argument("--profile", choices= EncoderProfile.profiles(), default= None, help= "pick the encoder settings with EncoderProfile instead of --preset")
+    parser.add_argument("--backend", choices= ("moviepy", "pipe"), default= "moviepy")
+    parser.add_argument("--compositor", action= "store_true", help= "build the clips with the LayerCompositor")
+    parser.add_argument("--workers", type= int, default= 0, help= "render with render_parallel on this many workers")
+    parser.add_argument("--baseline", default= BASELINE_PATH)
+    parser.add_argument("--update-baseline", action= "store_true")
+    parser.add_argument("--tolerance", type= float, default= 0.1, help= "allowed relative throughput drop")
+    args = parser.parse_args()
+
+    try:
+        ImageFont.truetype(args.font, 20)
+    except OSError:
+        print(f"Skipping the benchmark: the font {args.font} was not found, pass an installed one with --font.")
+        return
+
+    results = run(args)
+    print(json.dumps(results, indent= 2))
+
+    baselines = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baselines = json.load(baseline_file)
+    name = f"{args.backend}{f'-{args.profile}' if args.profile else ''}{'-compositor' if args.compositor else ''}{f'-parallel{args.workers}' if args.workers else ''}"
+
+    if args.update_baseline:
+        baselines[name] = results
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baselines, baseline_file, indent= 2)
+    elif name in baselines and not compare(results, baselines[name], args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
-from Slides2Video import *
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Slides2Video import *
+
 
 def main():
     Resolution.set_resolution(1920, 1080)
@@ -25,7 +30,7 @@ def main():
     final_clip.add_audio("./resources/bg_music.mp3", 0, 5, 1, 0)
     final_clip.add_audio("./resources/bg_music.mp3", 5, 25, 3, 5)
     final_clip.add_audio("./resources/bg_music.mp3", 25, 30, 1, 25)
-    final_clip.render(f"{time.strftime('%#d-%#m-%Y')}.mp4", True, 24, "medium", "nvenc_h264", 14)
+    final_clip.render(f"{time.strftime('%#d-%#m-%Y')}.mp4", True, 24, codec= "h264_nvenc", profile= "balanced")
 
 
 if __name__ == "__main__":
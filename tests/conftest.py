@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from moviepy.config import get_setting
+from PIL import Image, ImageFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Slides2Video import *
+
+
+FONT = "DejaVuSans"
+
+
+def ffmpeg(*args: str) -> None:
+    subprocess.run([get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", *args], check= True)
+
+
+def count_frames(path: str) -> int:
+    """
+    Count the video frames of a file by decoding it.
+    """
+
+    output = subprocess.run([get_setting("FFMPEG_BINARY"), "-loglevel", "error", "-i", path, "-map", "0:v", "-f", "framemd5", "-"],
+                            stdout= subprocess.PIPE, check= True).stdout.decode()
+
+    return sum(1 for line in output.splitlines() if line and not line.startswith("#"))
+
+
+@pytest.fixture(scope= "session")
+def assets(tmp_path_factory) -> dict:
+    """
+    Small synthetic images, videos and audio shared by the tests.
+    """
+
+    asset_dir = tmp_path_factory.mktemp("assets")
+    paths = {name: str(asset_dir / name) for name in ("slide.png", "text_bg.png", "intro.mp4", "silent.mp4", "tone.wav", "broken.mp3")}
+
+    gradient = np.linspace(0, 255, 160, dtype= np.uint8)[None, :, None].repeat(90, axis= 0).repeat(3, axis= 2)
+    Image.fromarray(gradient).save(paths["slide.png"])
+    Image.new("RGBA", (60, 20), (20, 20, 20, 200)).save(paths["text_bg.png"])
+
+    ffmpeg("-f", "lavfi", "-i", "testsrc=size=160x90:rate=12", "-f", "lavfi", "-i", "sine=frequency=330", "-t", "5",
+           "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", paths["intro.mp4"])
+    ffmpeg("-i", paths["intro.mp4"], "-an", "-c", "copy", paths["silent.mp4"])
+
+    # One second ramp from 0 to 0.5, so each sample tells where it came from.
+    ffmpeg("-f", "lavfi", "-i", "aevalsrc=0.5*t|0.5*t:s=44100:d=1", "-c:a", "pcm_s16le", paths["tone.wav"])
+    with open(paths["broken.mp3"], "wb") as broken:
+        broken.write(b"not an mp3")
+
+    return paths
+
+
+@pytest.fixture(autouse= True)
+def defaults():
+    Resolution.set_resolution(160, 90)
+    TextCache.configure(backend= "pillow")
+    TextCache.clear()
+
+
+@pytest.fixture(scope= "session")
+def font() -> str:
+    """
+    Font for text overlays, skipping the test where text can't be rendered.
+    """
+
+    try:
+        ImageFont.truetype(FONT, 20)
+    except OSError:
+        pytest.skip(f"The {FONT} font is not installed")
+
+    return FONT
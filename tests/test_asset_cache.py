@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from PIL import Image
+
+from Slides2Video import *
+
+
+@pytest.fixture(autouse= True)
+def empty_cache():
+    AssetCache.configure()
+    AssetCache.clear()
+
+
+def test_repeated_image_is_decoded_once(assets):
+    first = AssetCache.image(assets["slide.png"], (80, 45))
+    second = AssetCache.image(assets["slide.png"], (80, 45))
+
+    assert second is first
+    assert first.shape == (45, 80, 3)
+    assert not first.flags.writeable
+    assert AssetCache.image(assets["slide.png"]).shape == (90, 160, 3)
+
+
+def test_alpha_is_kept(assets):
+    assert AssetCache.image(assets["text_bg.png"]).shape == (20, 60, 4)
+
+
+def test_least_recently_used_image_is_evicted(assets):
+    sizes = [(40, 20), (60, 30), (80, 40)]
+    a, b, c = (AssetCache.image(assets["slide.png"], size) for size in sizes)
+    # Room for any two of the images, but not for all three.
+    AssetCache.configure(max_size= b.nbytes + c.nbytes)
+    AssetCache.clear()
+
+    a = AssetCache.image(assets["slide.png"], sizes[0])
+    b = AssetCache.image(assets["slide.png"], sizes[1])
+    assert AssetCache.image(assets["slide.png"], sizes[0]) is a
+    AssetCache.image(assets["slide.png"], sizes[2])
+
+    assert AssetCache.image(assets["slide.png"], sizes[0]) is a
+    assert AssetCache.image(assets["slide.png"], sizes[1]) is not b
+
+
+def test_changed_image_is_decoded_again(tmp_path):
+    path = tmp_path / "slide.png"
+    Image.new("RGB", (16, 9), (255, 0, 0)).save(path)
+    before = AssetCache.image(str(path))
+
+    Image.new("RGB", (16, 9), (0, 0, 255)).save(path)
+    os.utime(path, ns= (os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+    after = AssetCache.image(str(path))
+
+    assert before[0, 0].tolist() == [255, 0, 0]
+    assert after[0, 0].tolist() == [0, 0, 255]
@@ -0,0 +1,124 @@
+import wave
+
+import moviepy.audio.io.AudioFileClip
+import numpy as np
+import pytest
+
+from Slides2Video import *
+
+FPS = 44100
+
+
+def ramp(seconds: float) -> float:
+    """
+    Value of the test tone at a time in the file.
+    """
+
+    return 0.5 * seconds
+
+
+def test_region_plays_at_offset(assets):
+    track = AudioMixer.mix([(assets["tone.wav"], 0.2, 0.6, 1.0, 1.0)], 2)
+
+    assert track.shape == (2 * FPS, 2)
+    assert not track[:FPS].any()
+    assert track[FPS] == pytest.approx([ramp(0.2)] * 2, abs= 1e-3)
+    assert track[FPS + FPS // 5] == pytest.approx([ramp(0.4)] * 2, abs= 1e-3)
+    assert not track[int(1.4 * FPS) + 1:].any()
+
+
+def test_volume_scales_samples(assets):
+    track = AudioMixer.mix([(assets["tone.wav"], 0, 1, 0.5, 0)], 1)
+
+    assert track[FPS // 2, 0] == pytest.approx(0.5 * ramp(0.5), abs= 1e-3)
+
+
+def test_end_clamped_to_file_length(assets):
+    track = AudioMixer.mix([(assets["tone.wav"], 0.5, 10, 1.0, 0)], 3)
+
+    assert track[FPS // 2 - 1, 0] == pytest.approx(ramp(1 - 1 / FPS), abs= 1e-3)
+    assert not track[FPS // 2 + 1:].any()
+
+
+def test_end_before_start_plays_nothing(assets):
+    assert not AudioMixer.mix([(assets["tone.wav"], 0.6, 0.2, 1.0, 0)], 1).any()
+
+
+def test_negative_play_time_trims_the_start(assets):
+    track = AudioMixer.mix([(assets["tone.wav"], 0, 1, 1.0, -0.25)], 1)
+
+    assert track[0, 0] == pytest.approx(ramp(0.25), abs= 1e-3)
+    assert not track[int(0.75 * FPS) + 1:].any()
+
+
+def test_region_clamped_to_track_and_limit(assets):
+    track = AudioMixer.mix([(assets["tone.wav"], 0, 1, 1.0, 0.8)], 1)
+    assert track[-1, 0] == pytest.approx(ramp(0.2 - 1 / FPS), abs= 1e-3)
+
+    track = AudioMixer.mix([(assets["tone.wav"], 0, 1, 1.0, 0, 0.1)], 1)
+    assert track[int(0.1 * FPS) - 1].any()
+    assert not track[int(0.1 * FPS):].any()
+
+
+def test_overlapping_regions_add_up(assets):
+    track = AudioMixer.mix([(assets["tone.wav"], 0.5, 1, 1.0, 0), (assets["tone.wav"], 0.5, 1, 1.0, 0)], 1)
+
+    assert track[0, 0] == pytest.approx(2 * ramp(0.5), abs= 1e-3)
+
+
+def test_files_without_audio(assets):
+    assert AudioMixer.mix([(assets["silent.mp4"], 0, 1, 1.0, 0)], 1) is None
+
+
+def test_unreadable_file_raises(assets):
+    with pytest.raises(IOError):
+        AudioMixer.mix([(assets["broken.mp3"], 0, 1, 1.0, 0)], 1)
+
+
+def test_blocks_match_the_whole_track(assets):
+    regions = [(assets["tone.wav"], 0.1, 0.9, 0.7, 0.3), (assets["tone.wav"], 0, 1, 0.5, -0.2, 0.5)]
+    track = AudioMixer.mix(regions, 2)
+
+    blocks = [AudioMixer.mix(regions, (end - start) / FPS, start / FPS) for start, end in ((0, 12345), (12345, 50000), (50000, 2 * FPS))]
+
+    assert np.array_equal(np.concatenate(blocks), track)
+
+
+def test_clip_mixes_the_samples_read(assets):
+    regions = [(assets["tone.wav"], 0, 1, 1.0, 0.5)]
+    track = AudioMixer.mix(regions, 2)
+    clip = AudioMixer.clip(regions, 2)
+
+    assert np.array_equal(clip.get_frame(np.arange(30000, 60000) / FPS), track[30000:60000])
+    assert np.array_equal(clip.get_frame(1.0), track[FPS])
+    assert not AudioMixer.clip([(assets["silent.mp4"], 0, 1, 1.0, 0)], 1).get_frame(np.arange(100) / FPS).any()
+
+
+def test_wav_is_written_in_blocks(assets, tmp_path, monkeypatch):
+    monkeypatch.setattr(AudioMixer, "_AudioMixer__block_size", 1000)
+    regions = [(assets["tone.wav"], 0, 1, 1.0, 0.25)]
+    path = str(tmp_path / "mix.wav")
+
+    AudioMixer.write_wav(AudioMixer.clip(regions, 1.5), path)
+
+    with wave.open(path) as wav_file:
+        written = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype= "<i2").reshape(-1, 2)
+    assert np.array_equal(written, (np.clip(AudioMixer.mix(regions, 1.5), -1, 1) * 32767).astype("<i2"))
+
+
+def test_cards_open_no_audio_reader(assets, tmp_path, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("An audio reader was opened")
+
+    monkeypatch.setattr(moviepy.audio.io.AudioFileClip, "FFMPEG_AudioReader", refuse)
+    output = str(tmp_path / "out.mp4")
+
+    title_card = TitleCard(assets["intro.mp4"], 1)
+    slide = Slide(assets["slide.png"], 1)
+    slide.add_audio(assets["tone.wav"], 0, 1)
+    end_card = EndCard(assets["intro.mp4"], 1)
+    end_card.add_audio(assets["tone.wav"], 0, 1, 0.5)
+    RenderClips([title_card.make_title_card(), slide.make_slide(), end_card.make_end_card()]).render(output, fps= 12, preset= "ultrafast", backend= "pipe")
+
+    assert MediaProbe.probe(output) is not None
+    assert AudioMixer.pcm(output).shape[0] == pytest.approx(3 * FPS, rel= 0.05)
@@ -0,0 +1,101 @@
+import multiprocessing
+import time
+
+import pytest
+
+from Slides2Video import BatchRenderer
+
+
+def make_deck(assets: dict, tmp_path, job_id: str, duration: float = 1, **options) -> dict:
+    return {"id": job_id, "resolution": [160, 90], "text_backend": "pillow", "slides": [{"image": assets["slide.png"], "duration": duration}],
+            "render": {"output_filename": str(tmp_path / f"{job_id}.mp4"), "fps": 12, "backend": "pipe", "preset": "ultrafast"}, **options}
+
+
+def wait_for_status(renderer: BatchRenderer, job_id: str, status: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while renderer.status(job_id)["status"] != status:
+        assert time.monotonic() < deadline, f"{job_id} never became {status}"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def renderer():
+    renderer = BatchRenderer(workers= 1)
+    yield renderer
+    renderer.shutdown()
+
+
+def test_failed_job_is_retried(assets, tmp_path, renderer):
+    deck = make_deck(assets, tmp_path, "missing", retries= 2)
+    deck["slides"][0]["image"] = str(tmp_path / "missing.png")
+    renderer.submit(deck)
+    renderer.submit(make_deck(assets, tmp_path, "ok"))
+
+    statuses = renderer.wait()
+
+    assert statuses["missing"]["status"] == "failed"
+    assert statuses["missing"]["attempts"] == 3
+    assert "FileNotFoundError" in statuses["missing"]["error"]
+    assert statuses["ok"]["status"] == "done"
+
+
+def test_cancel_queued_and_running_jobs(assets, tmp_path, renderer):
+    renderer.submit(make_deck(assets, tmp_path, "long", duration= 600))
+    renderer.submit(make_deck(assets, tmp_path, "queued"))
+    renderer.submit(make_deck(assets, tmp_path, "after"))
+    wait_for_status(renderer, "long", "running")
+
+    assert renderer.cancel("queued")
+    assert renderer.cancel("long")
+    assert not renderer.cancel("long")
+
+    statuses = renderer.wait()
+
+    assert statuses["long"]["status"] == "cancelled"
+    assert statuses["queued"]["status"] == "cancelled"
+    assert statuses["queued"]["attempts"] == 0
+    assert statuses["after"]["status"] == "done"
+
+
+def test_dead_worker_fails_only_its_attempt(assets, tmp_path, renderer):
+    renderer.submit(make_deck(assets, tmp_path, "killed", duration= 600, retries= 1))
+    renderer.submit(make_deck(assets, tmp_path, "next"))
+    wait_for_status(renderer, "killed", "running")
+    time.sleep(1)
+
+    for child in multiprocessing.active_children():
+        child.kill()
+    wait_for_status(renderer, "killed", "queued")
+    assert "Worker exited" in renderer.status("killed")["error"]
+
+    wait_for_status(renderer, "killed", "running")
+    renderer.cancel("killed")
+    statuses = renderer.wait()
+
+    assert statuses["killed"]["attempts"] == 2
+    assert statuses["next"]["status"] == "done"
+
+
+def test_invalid_manifest_queues_nothing(assets, tmp_path, renderer):
+    renderer.submit(make_deck(assets, tmp_path, "long", duration= 600))
+
+    for decks in (["first", "second", "first"], ["first", "long"]):
+        with pytest.raises(ValueError):
+            renderer.submit_all([make_deck(assets, tmp_path, job_id) for job_id in decks])
+    with pytest.raises(TypeError):
+        renderer.submit_all([make_deck(assets, tmp_path, "first"), "second"])
+
+    assert list(renderer.status()) == ["long"]
+    renderer.cancel("long")
+
+
+def test_unreachable_worker_fails_the_attempt(assets, tmp_path, renderer, monkeypatch):
+    connection, _ = multiprocessing.Pipe()
+    connection.close()
+    monkeypatch.setattr(renderer, "_BatchRenderer__start_worker", lambda: {"process": None, "connection": connection})
+
+    renderer.submit(make_deck(assets, tmp_path, "unreachable"))
+    statuses = renderer.wait()
+
+    assert statuses["unreachable"]["status"] == "failed"
+    assert renderer._BatchRenderer__busy == {}
@@ -0,0 +1,72 @@
+import subprocess
+
+import pytest
+
+from Slides2Video import EncoderProfile
+
+
+ENCODERS = """Encoders:
+ V..... = Video
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+
+@pytest.fixture
+def encoders(monkeypatch) -> list:
+    """
+    Fake ffmpeg that lists NVENC but has no GPU to run it, recording the encoders tried on a test frame.
+    """
+
+    tried = []
+
+    def run(command, **kwargs):
+        if "-encoders" in command:
+            return subprocess.CompletedProcess(command, 0, stdout= ENCODERS.encode())
+        codec = command[command.index("-c:v") + 1]
+        tried.append(codec)
+        return subprocess.CompletedProcess(command, 0 if codec == "libx264" else 1)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    monkeypatch.setattr(EncoderProfile, "_EncoderProfile__available", {})
+
+    return tried
+
+
+def test_listed_hardware_encoder_without_device_falls_back_to_cpu(encoders):
+    settings = EncoderProfile.select("balanced", ".mp4", workers= 1)
+
+    assert settings["codec"] == "libx264"
+    assert settings["preset"] == "fast"
+    assert settings["ffmpeg_params"] == ["-crf", "23"]
+    # QSV isn't listed, so only the listed encoders are tried on a frame.
+    assert encoders == ["h264_nvenc", "libx264"]
+
+
+def test_requested_codec_falls_back(encoders, capsys):
+    settings = EncoderProfile.select("draft", ".mp4", codec= "nvenc_h264")
+
+    assert settings["codec"] == "libx264"
+    assert settings["preset"] == "ultrafast"
+    assert "nvenc_h264 is not available" in capsys.readouterr().out
+
+
+def test_availability_is_cached(encoders):
+    EncoderProfile.select("draft")
+    EncoderProfile.select("archive")
+
+    assert encoders.count("libx264") == 1
+
+
+def test_threads_are_shared_between_workers(encoders, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+
+    assert EncoderProfile.select("archive", workers= 4)["threads"] == 2
+    assert EncoderProfile.select("archive", ".gif")["codec"] is None
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match= "Unknown encoder profile"):
+        EncoderProfile.select("fastest")
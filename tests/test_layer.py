@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from Slides2Video import Layer, LayerCompositor, Motion
+
+
+def float_blend(frame: np.ndarray, img: np.ndarray, alpha: np.ndarray, x: int, y: int) -> np.ndarray:
+    """
+    Reference blend in floating point, clipped to the frame.
+    """
+
+    expected = frame.astype(np.float64)
+    height, width = img.shape[:2]
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(frame.shape[1], x + width), min(frame.shape[0], y + height)
+    weight = alpha[y1 - y:y2 - y, x1 - x:x2 - x, None] / 255
+    expected[y1:y2, x1:x2] = img[y1 - y:y2 - y, x1 - x:x2 - x] * weight + expected[y1:y2, x1:x2] * (1 - weight)
+
+    return expected
+
+
+@pytest.fixture
+def layer_data():
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 256, (20, 30, 3), dtype= np.uint8)
+    alpha = rng.integers(0, 256, (20, 30)).astype(np.float64)
+    frame = rng.integers(0, 256, (40, 50, 3), dtype= np.uint8)
+
+    return img, alpha, frame
+
+
+@pytest.mark.parametrize("position", [(5, 7), (-6, -4), (35, 28)])
+def test_draw_matches_float_blend(layer_data, position):
+    img, alpha, frame = layer_data
+    layer = Layer(img, alpha, 0, 1, position, fps= 10)
+
+    drawn = frame.copy()
+    layer.draw(drawn, 0.5)
+
+    expected = float_blend(frame, img, alpha, *position)
+    assert np.abs(drawn.astype(np.float64) - expected).max() <= 1
+
+
+def test_draw_fade_scales_alpha(layer_data):
+    img, alpha, frame = layer_data
+    layer = Layer(img, alpha, 0, 2, (5, 7), fadein= 1, fps= 10)
+
+    drawn = frame.copy()
+    layer.draw(drawn, 0.3)
+
+    # The faded alpha is rounded to an integer before blending, hence the extra unit of tolerance.
+    expected = float_blend(frame, img, alpha * round(255 * 0.3) / 255, 5, 7)
+    assert np.abs(drawn.astype(np.float64) - expected).max() <= 2
+
+
+def test_draw_opaque_copies_image(layer_data):
+    img, _, frame = layer_data
+    layer = Layer(img, None, 0, 1, (5, 7), fps= 10)
+
+    drawn = frame.copy()
+    layer.draw(drawn, 0)
+
+    assert np.array_equal(drawn[7:27, 5:35], img)
+
+
+def test_compositor_draws_only_playing_layers(layer_data):
+    img, alpha, frame = layer_data
+    compositor = LayerCompositor(frame, [Layer(img, alpha, 1, 2, (5, 7), fps= 10)], 3)
+
+    before = compositor.get_frame(0.5)
+    during = compositor.get_frame(1.5)
+
+    assert np.array_equal(before, frame)
+    assert np.abs(during.astype(np.float64) - float_blend(frame, img, alpha, 5, 7)).max() <= 1
+    # Frames come from a ring of buffers, so the previous frame is still intact.
+    assert np.array_equal(before, frame)
+
+
+def make_compositor(layer_data, fps: int) -> LayerCompositor:
+    img, alpha, frame = layer_data
+    layers = [Layer(img, alpha, 0, 3, Motion([(0, -30, 5), (0.5, 10, 5), (2, 10, 5), (2.5, 20, 15, 0)]), fadein= 0.3, fps= fps),
+              Layer(img, None, 1, 2, (25, 20), fps= fps),
+              Layer(img, alpha, 0.5, 3, lambda t: (int(4 * t), 2), fps= fps)]
+
+    return LayerCompositor(frame, layers, 3)
+
+
+def test_compositor_frames_do_not_depend_on_request_order(layer_data):
+    fps = 10
+    times = [index / fps for index in range(30)]
+    # A fresh compositor for each frame can't reuse anything, so its frames are the reference.
+    expected = [make_compositor(layer_data, fps).get_frame(t).copy() for t in times]
+
+    order = np.random.default_rng(2).permutation(len(times)).tolist()
+    for requests in (list(range(len(times))), order, order[::-1] + order, [index // 2 for index in range(2 * len(times))]):
+        compositor = make_compositor(layer_data, fps)
+        for index in requests:
+            assert np.array_equal(compositor.get_frame(times[index]), expected[index]), f"frame {index} in order {requests}"
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from Slides2Video import *
+
+
+def old_position(direction: str, size: tuple[int, int], postion: tuple[int, int]):
+    """
+    The position lambdas Slide.add_text used before captions moved to Motion.
+    """
+
+    if direction == "left":
+        return lambda t: (min(size[0] + postion[0], t * 1000) - size[0], Resolution.height() - (size[1] + postion[1]))
+
+    return lambda t: (Resolution.width() - min(size[0] + postion[0], t * 1000), Resolution.height() - (size[1] + postion[1]))
+
+
+@pytest.mark.parametrize("direction", ["left", "right"])
+@pytest.mark.parametrize("fps", [24, 30, 60])
+def test_slide_in_matches_the_old_lambdas(direction, fps):
+    size, postion = (57, 23), (13, 9)
+    motion = Motion.slide_in(direction, size, postion)
+    old = old_position(direction, size, postion)
+
+    times = np.arange(0, 1, 1 / fps)
+    assert np.allclose(motion.at(times)[:, :2], [old(t) for t in times], atol= 1e-9)
+    assert [motion.position(t) for t in times] == [tuple(math.floor(value) for value in old(t)) for t in times]
+
+
+def test_easing_keeps_the_end_points():
+    linear = Motion.slide_in("left", (50, 20), (10, 5))
+    eased = Motion.slide_in("left", (50, 20), (10, 5), easing= "ease_in_out")
+
+    assert np.allclose(eased.at([0, 0.06, 1]), linear.at([0, 0.06, 1]))
+    assert eased.at(0.015)[0] < linear.at(0.015)[0]
+
+
+def test_keyframe_opacity_and_shift():
+    motion = Motion([(0, 0, 0, 0), (1, 100, 50)], "linear")
+
+    assert motion.at(0.5).tolist() == [50, 25, 0.5]
+    assert not motion.is_opaque()
+    assert motion.shifted(dx= 10, dt= 1).at(1.5).tolist() == [60, 25, 0.5]
+
+
+def test_unknown_easing():
+    with pytest.raises(ValueError, match= "Unknown easing"):
+        Motion([(0, 0, 0)], "bounce")
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from conftest import count_frames
+from Slides2Video import FFmpegPipeWriter
+
+
+def test_frames_are_written(tmp_path):
+    output = str(tmp_path / "out.mp4")
+
+    with FFmpegPipeWriter(output, (64, 36), fps= 10, preset= "ultrafast") as writer:
+        for value in range(0, 250, 10):
+            writer.write_frame(np.full((36, 64, 3), value, dtype= np.uint8))
+
+    assert count_frames(output) == 25
+
+
+def test_ffmpeg_error_is_reported(tmp_path):
+    frame = np.zeros((640, 640, 3), dtype= np.uint8)
+    output = str(tmp_path / "missing" / "out.mp4")
+
+    with pytest.raises(IOError, match= "ffmpeg failed to encode the video") as error:
+        with FFmpegPipeWriter(output, (640, 640), fps= 10, preset= "ultrafast") as writer:
+            for _ in range(100):
+                writer.write_frame(frame)
+
+    assert "out.mp4" in str(error.value)
+    # The writer is already closed, so closing it again doesn't touch the finished process.
+    writer.close()
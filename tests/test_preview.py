@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import count_frames
+from Slides2Video import *
+
+
+def make_deck(assets) -> RenderClips:
+    return RenderClips([TitleCard(assets["silent.mp4"], 2), Slide(assets["slide.png"], 1), EndCard(assets["silent.mp4"], 2)], stream= True)
+
+
+def test_preview_size_and_frame_rate(assets, tmp_path):
+    output = str(tmp_path / "preview.mp4")
+
+    make_deck(assets).preview(output, scale= 0.5, fps= 6, audio= False)
+
+    probe = MediaProbe.probe(output)
+    assert (probe["width"], probe["height"], probe["fps"]) == (80, 44, 6)
+    assert count_frames(output) == 5 * 6
+
+
+def test_preview_range_and_cache(assets, tmp_path):
+    cache = SegmentCache(str(tmp_path / "cache"))
+
+    make_deck(assets).preview(str(tmp_path / "first.mp4"), fps= 6, start= 1, end= 4, audio= False, cache= cache)
+    cached = sorted(os.listdir(tmp_path / "cache"))
+    make_deck(assets).preview(str(tmp_path / "second.mp4"), fps= 6, start= 1, end= 4, audio= False, cache= cache)
+
+    assert count_frames(str(tmp_path / "second.mp4")) == 3 * 6
+    assert sorted(os.listdir(tmp_path / "cache")) == cached
+
+
+def test_contact_sheet_has_a_thumbnail_per_clip(assets, tmp_path):
+    output = str(tmp_path / "sheet.png")
+
+    make_deck(assets).preview(output, scale= 0.25, contact_sheet= True)
+
+    # Three clips fit a 2x2 grid of 40x22 thumbnails.
+    assert Image.open(output).size == (80, 44)
+
+
+def test_frame_resizer_averages_areas():
+    frame = np.zeros((4, 4, 3), dtype= np.uint8)
+    frame[:2, :2] = 200
+    frame[2:, 2:] = 100
+
+    resized = FrameResizer((4, 4), (2, 2)).resize(frame)
+
+    assert resized[..., 0].tolist() == [[200, 0], [0, 100]]
+    assert FrameResizer((4, 4), (4, 4)).resize(frame) is frame
+
+
+def test_frame_resizer_crops_to_the_output_aspect_ratio():
+    assert FrameResizer((160, 90), (90, 160)).crop == (54, 0, 51, 90)
+
+    with pytest.raises(ValueError, match= "outside"):
+        FrameResizer((160, 90), (80, 45), (100, 0, 80, 45))
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+from Slides2Video import *
+
+FPS = 12
+
+
+@pytest.fixture
+def profiler():
+    RenderProfiler.enable()
+    yield RenderProfiler
+    RenderProfiler.disable()
+    RenderProfiler.reset()
+
+
+def make_deck(assets: dict) -> RenderClips:
+    return RenderClips([TitleCard(assets["intro.mp4"], 1).make_title_card(), Slide(assets["slide.png"], 1).make_slide()])
+
+
+@pytest.mark.parametrize("backend", ["moviepy", "pipe"])
+def test_stages_are_recorded_per_segment(assets, tmp_path, profiler, backend):
+    write_frame = FFMPEG_VideoWriter.write_frame
+
+    make_deck(assets).render(str(tmp_path / "out.mp4"), audio= False, fps= FPS, preset= "ultrafast", backend= backend)
+    report = profiler.report()
+
+    # moviepy may take the first frame once more to learn the size of the clip.
+    assert report["segments"]["0"]["frames"]["count"] >= FPS
+    assert report["segments"]["1"]["frames"]["count"] == FPS
+    assert {"video_decode", "composite", "frame", "encode"} <= set(report["segments"]["0"]["stages"])
+    assert {"frame", "encode"} <= set(report["segments"]["1"]["stages"])
+    assert "render" in report["segments"]["deck"]["stages"]
+    # Encoding is timed without patching moviepy's writer.
+    assert FFMPEG_VideoWriter.write_frame is write_frame
+
+
+def test_segments_are_kept_per_thread(profiler):
+    RenderProfiler.set_segment(3)
+    thread = threading.Thread(target= lambda: RenderProfiler.set_segment(7))
+    thread.start()
+    thread.join()
+
+    assert RenderProfiler.segment() == 3
+
+
+def test_disabled_profiler_records_nothing(assets, tmp_path):
+    make_deck(assets).render(str(tmp_path / "out.mp4"), audio= False, fps= FPS, preset= "ultrafast")
+
+    assert RenderProfiler.report()["segments"] == {}
+
+
+def test_chrome_trace(tmp_path, profiler):
+    with RenderProfiler.stage("audio"):
+        with RenderProfiler.stage("text"):
+            pass
+    RenderProfiler.to_chrome_trace(str(tmp_path / "trace.json"))
+
+    with open(tmp_path / "trace.json") as trace_file:
+        events = json.load(trace_file)["traceEvents"]
+    assert [event["name"] for event in events] == ["text", "audio"]
@@ -0,0 +1,177 @@
+import gc
+import os
+import subprocess
+
+import pytest
+
+from PIL import Image
+
+from conftest import count_frames
+from Slides2Video import *
+
+FPS = 12
+
+
+def make_deck(assets: dict, stream: bool = False) -> RenderClips:
+    """
+    A 10 second deck whose clips don't end on whole seconds.
+    """
+
+    items = [TitleCard(assets["intro.mp4"], 2.5), Slide(assets["slide.png"], 3.3), EndCard(assets["intro.mp4"], 4.2)]
+    if not stream:
+        items = [items[0].make_title_card(), items[1].make_slide(), items[2].make_end_card()]
+
+    render_clips = RenderClips(items, stream= stream)
+    render_clips.add_audio(assets["tone.wav"], 0, 1)
+
+    return render_clips
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("method, options", [
+    ("render", {}),
+    ("render", {"backend": "pipe"}),
+    ("render_parallel", {"workers": 2}),
+    ("render_parallel", {"workers": 2, "chunk_duration": 0.7}),
+])
+def test_frame_count_parity(assets, tmp_path, method, options, stream):
+    output = str(tmp_path / "out.mp4")
+
+    getattr(make_deck(assets, stream), method)(output, fps= FPS, preset= "ultrafast", **options)
+
+    assert count_frames(output) == 10 * FPS
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_render_parallel_without_fork_uses_threads(assets, tmp_path, monkeypatch, stream):
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    output = str(tmp_path / "out.mp4")
+
+    make_deck(assets, stream).render_parallel(output, workers= 2, fps= FPS, preset= "ultrafast", chunk_duration= 0.7)
+
+    assert count_frames(output) == 10 * FPS
+
+
+def test_concurrent_renders_keep_their_own_context(assets, tmp_path):
+    def render(width: int, height: int) -> str:
+        context = RenderContext(width, height, fps= FPS)
+        output = str(tmp_path / f"{width}x{height}.mp4")
+        items = [TitleCard(assets["intro.mp4"], 2, context), Slide(assets["slide.png"], 1, context)]
+        RenderClips(items, stream= True, context= context).render_parallel(output, workers= 2, audio= False, preset= "ultrafast")
+        return output
+
+    # Another thread runs, so both renders use worker threads rather than fork.
+    with ThreadPoolExecutor(2) as executor:
+        outputs = list(executor.map(render, (160, 96), (90, 54)))
+
+    for output, size in zip(outputs, [(160, 90), (96, 54)]):
+        probe = MediaProbe.probe(output)
+        assert (probe["width"], probe["height"]) == size
+        assert count_frames(output) == 3 * FPS
+
+
+def test_cached_render_encodes_only_changed_clips(assets, tmp_path, monkeypatch):
+    encoded = []
+    write_range = RenderClips._RenderClips__write_range
+    monkeypatch.setattr(RenderClips, "_RenderClips__write_range", lambda timeline, bounds, start, *args: encoded.append(start) or write_range(timeline, bounds, start, *args))
+    cache = SegmentCache(str(tmp_path / "cache"))
+    output = str(tmp_path / "out.mp4")
+
+    make_deck(assets).render(output, fps= FPS, preset= "ultrafast", cache= cache)
+    assert count_frames(output) == 10 * FPS
+    assert len(encoded) == 3
+
+    make_deck(assets).render(output, fps= FPS, preset= "ultrafast", cache= cache)
+    assert len(encoded) == 3
+
+    # A new slide image only invalidates the slide.
+    image = Image.open(assets["slide.png"])
+    image.transpose(Image.FLIP_LEFT_RIGHT).save(assets["slide.png"])
+    try:
+        make_deck(assets).render(output, fps= FPS, preset= "ultrafast", cache= cache)
+    finally:
+        image.save(assets["slide.png"])
+
+    assert encoded[3:] == [2.5]
+    assert count_frames(output) == 10 * FPS
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason= "Needs /proc to count open files")
+def test_streaming_keeps_open_files_flat(assets, tmp_path):
+    open_files = []
+
+    def make_card() -> VideoClip:
+        open_files.append(len(os.listdir("/proc/self/fd")))
+        title_card = TitleCard(assets["intro.mp4"], 1)
+        title_card.add_audio(assets["tone.wav"], 0, 1)
+        return title_card.make_title_card()
+
+    output = str(tmp_path / "out.mp4")
+    # Readers left behind by other tests close when collected, so only growth counts.
+    gc.collect()
+    RenderClips([(1, make_card)] * 8, stream= True).render(output, fps= FPS, preset= "ultrafast")
+
+    # Once the audio and the video writer each hold a card, every card built next replaces one of them.
+    assert len(open_files) == 16
+    assert max(open_files[2:]) == open_files[2]
+    assert count_frames(output) == 8 * FPS
+
+
+def test_context_color_depth(assets, tmp_path):
+    context = RenderContext(160, 90, fps= FPS, color_depth= 10)
+    output = str(tmp_path / "out.mp4")
+
+    RenderClips([Slide(assets["slide.png"], 1, context)], stream= True, context= context).render(output, audio= False, preset= "ultrafast", backend= "pipe")
+
+    assert MediaProbe.probe(output)["pix_fmt"] == "yuv420p10le"
+    assert count_frames(output) == FPS
+
+
+def test_render_outputs_sizes_and_frame_counts(assets, tmp_path):
+    outputs = [
+        {"output_filename": str(tmp_path / "full.mp4"), "preset": "ultrafast"},
+        {"output_filename": str(tmp_path / "half.mp4"), "resolution": (80, 44), "fps": FPS // 2, "preset": "ultrafast"},
+        {"output_filename": str(tmp_path / "vertical.mp4"), "resolution": (54, 90), "preset": "ultrafast", "bitrate": "200k"},
+    ]
+
+    make_deck(assets, stream= True).render_outputs(outputs)
+
+    # make_deck has no context, so the outputs default to 60 fps unless they set their own.
+    for output, size, fps in zip(outputs, [(160, 90), (80, 44), (54, 90)], [60, FPS // 2, 60]):
+        probe = MediaProbe.probe(output["output_filename"])
+        assert (probe["width"], probe["height"], probe["fps"]) == (*size, fps)
+        assert count_frames(output["output_filename"]) == 10 * fps
+
+
+def stream_md5(path: str) -> str:
+    return subprocess.run([get_setting("FFMPEG_BINARY"), "-loglevel", "error", "-i", path, "-map", "0:v", "-c", "copy", "-f", "md5", "-"],
+                          stdout= subprocess.PIPE, check= True).stdout.decode()
+
+
+def test_checkpointed_render_resumes(assets, tmp_path, monkeypatch):
+    checkpoint_dir = tmp_path / "checkpoint"
+    options = {"fps": FPS, "preset": "ultrafast", "checkpoint_dir": str(checkpoint_dir), "chunk_duration": 2}
+    make_deck(assets, stream= True).render(str(tmp_path / "full.mp4"), **options)
+    assert not checkpoint_dir.exists()
+
+    # Interrupt the render after every chunk is encoded, then lose the last two chunks.
+    def interrupted(*args):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(RenderClips, "_concat_segments", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            make_deck(assets, stream= True).render(str(tmp_path / "resumed.mp4"), **options)
+    chunks = sorted(checkpoint_dir.glob("chunk*.mp4"))
+    assert len(chunks) == 5
+    for chunk in chunks[3:]:
+        chunk.unlink()
+
+    encoded = []
+    write_range = RenderClips._RenderClips__write_range
+    monkeypatch.setattr(RenderClips, "_RenderClips__write_range", lambda timeline, bounds, start, *args: encoded.append(start) or write_range(timeline, bounds, start, *args))
+    make_deck(assets, stream= True).render(str(tmp_path / "resumed.mp4"), **options)
+
+    assert encoded == [6, 8]
+    assert stream_md5(str(tmp_path / "resumed.mp4")) == stream_md5(str(tmp_path / "full.mp4"))
+    assert not checkpoint_dir.exists()
@@ -0,0 +1,78 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from Slides2Video import SegmentCache, Slide
+
+
+def add_segment(cache: SegmentCache, directory, key: str, size: int, mtime: int) -> str:
+    source = directory / f"{key}.part"
+    source.write_bytes(b"x" * size)
+    path = cache.put(key, str(source), ".mp4")
+    os.utime(path, (mtime, mtime))
+
+    return path
+
+
+def test_get_after_put(tmp_path):
+    cache = SegmentCache(str(tmp_path / "cache"))
+    path = add_segment(cache, tmp_path, "a", 10, 1000)
+
+    assert cache.get("a", ".mp4") == path
+    assert cache.get("b", ".mp4") is None
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = SegmentCache(str(tmp_path / "cache"), max_size= 250)
+    for index, key in enumerate("abc"):
+        add_segment(cache, tmp_path, key, 100, 1000 + index)
+
+    # Reading "a" makes it the most recently used, so "b" and then "c" go first.
+    cache.get("a", ".mp4")
+    cache.evict()
+
+    assert cache.get("b", ".mp4") is None
+    assert cache.get("c", ".mp4") is not None
+    assert cache.get("a", ".mp4") is not None
+
+
+def test_evict_keeps_cache_within_size(tmp_path):
+    cache = SegmentCache(str(tmp_path / "cache"), max_size= 150)
+    for index, key in enumerate("abcd"):
+        add_segment(cache, tmp_path, key, 100, 1000 + index)
+
+    cache.evict()
+
+    assert [key for key in "abcd" if cache.get(key, ".mp4")] == ["d"]
+
+
+def test_fingerprint_tracks_file_changes(tmp_path):
+    source = tmp_path / "slide.png"
+    source.write_bytes(b"one")
+    before = SegmentCache.fingerprint("slide", str(source), 5)
+
+    source.write_bytes(b"three")
+
+    assert SegmentCache.fingerprint("slide", str(source), 5) != before
+    assert SegmentCache.fingerprint("slide", str(source), 6) != SegmentCache.fingerprint("slide", str(source), 5)
+
+
+def test_concurrent_puts_of_the_same_key(tmp_path):
+    cache = SegmentCache(str(tmp_path / "cache"))
+    sources = []
+    for index in range(40):
+        source = tmp_path / f"part{index}"
+        source.write_bytes(b"x" * 1000)
+        sources.append(str(source))
+
+    with ThreadPoolExecutor(8) as executor:
+        paths = list(executor.map(lambda source: cache.put("a", source, ".mp4"), sources))
+
+    assert set(paths) == {cache.get("a", ".mp4")}
+    assert os.listdir(tmp_path / "cache") == ["a.mp4"]
+
+
+def test_fingerprint_depends_on_compositing_mode(assets):
+    slide = Slide(assets["slide.png"], 3)
+
+    assert slide._fingerprint("static") != slide._fingerprint("moviepy")
+    assert slide.make_slide(static_background= True).fingerprint == slide._fingerprint("static")
@@ -0,0 +1,36 @@
+import numpy as np
+
+from Slides2Video import *
+
+
+def make_slide(assets: dict, font: str = None) -> Slide:
+    slide = Slide(assets["slide.png"], 3)
+    if font:
+        slide.add_text("Caption", (10, 10), font, 12, assets["text_bg.png"], direction= "left")
+        slide.add_text("Other", (5, 40), font, 10, assets["text_bg.png"], start= 1, text_duration= 1.5)
+
+    return slide
+
+
+def test_static_background_matches_moviepy(assets):
+    slide = make_slide(assets)
+    static_clip, moviepy_clip = slide.make_slide(static_background= True), slide.make_slide()
+
+    for t in (0, 1.5, 2.99):
+        assert np.array_equal(static_clip.get_frame(t), moviepy_clip.get_frame(t))
+
+
+def test_static_background_with_text_matches_moviepy(assets, font):
+    slide = make_slide(assets, font)
+    static_clip, moviepy_clip = slide.make_slide(static_background= True), slide.make_slide()
+
+    for t in np.arange(0, 3, 1 / 12):
+        assert np.array_equal(static_clip.get_frame(t), moviepy_clip.get_frame(t)), t
+
+
+def test_frames_without_overlay_share_the_background(assets):
+    clip = make_slide(assets).make_slide(static_background= True)
+
+    frame = clip.get_frame(0)
+    assert clip.get_frame(2) is frame
+    assert not frame.flags.writeable
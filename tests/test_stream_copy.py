@@ -0,0 +1,34 @@
+import subprocess
+
+from moviepy.config import get_setting
+
+from conftest import count_frames, ffmpeg
+from Slides2Video import *
+
+FPS = 12
+
+
+def frame_md5s(path: str) -> list[str]:
+    """
+    Hash the decoded video frames of a file.
+    """
+
+    output = subprocess.run([get_setting("FFMPEG_BINARY"), "-loglevel", "error", "-i", path, "-map", "0:v", "-f", "framemd5", "-"],
+                            stdout= subprocess.PIPE, check= True).stdout.decode()
+
+    return [line.split(",")[-1].strip() for line in output.splitlines() if line and not line.startswith("#")]
+
+
+def test_text_free_start_is_copied_frame_for_frame(tmp_path, font):
+    # A keyframe every second, so the start of the card up to the text at 2.5 seconds is copied up to 2 seconds.
+    source = str(tmp_path / "keyframes.mp4")
+    ffmpeg("-f", "lavfi", "-i", f"testsrc=size=160x90:rate={FPS}", "-t", "4", "-c:v", "libx264", "-preset", "ultrafast",
+           "-pix_fmt", "yuv420p", "-g", str(FPS), "-keyint_min", str(FPS), "-sc_threshold", "0", source)
+    output = str(tmp_path / "out.mp4")
+
+    title_card = TitleCard(source, 4)
+    title_card.add_text("Title", 20, font, 20, start= 2.5)
+    RenderClips([title_card], stream= True).render_parallel(output, workers= 2, audio= False, fps= FPS, preset= "ultrafast", codec= "libx264", stream_copy= True)
+
+    assert count_frames(output) == 4 * FPS
+    assert frame_md5s(output)[:2 * FPS] == frame_md5s(source)[:2 * FPS]
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from Slides2Video import *
+
+
+@pytest.fixture
+def rasterized(monkeypatch) -> list:
+    """
+    Texts rasterized by the Pillow backend.
+    """
+
+    texts = []
+    rasterize = TextCache._TextCache__rasterize_pillow
+    monkeypatch.setattr(TextCache, "_TextCache__rasterize_pillow", lambda text, *args: texts.append(text) or rasterize(text, *args))
+
+    return texts
+
+
+def test_repeated_text_is_rasterized_once(font, rasterized):
+    first = TextCache.text_clip("Caption", font, 20)
+    second = TextCache.text_clip("Caption", font, 20)
+    TextCache.text_clip("Caption", font, 22)
+
+    assert rasterized == ["Caption", "Caption"]
+    assert second.img is first.img
+    assert not first.img.flags.writeable
+
+
+def test_least_recently_used_text_is_evicted(font, rasterized):
+    sizes = {}
+    for text in "abc":
+        clip = TextCache.text_clip(text, font, 20)
+        sizes[text] = clip.img.nbytes + clip.mask.img.nbytes
+    rasterized.clear()
+    # Room for any two of the texts, but not for all three.
+    TextCache.configure(max_size= sum(sizes.values()) - min(sizes.values()), backend= "pillow")
+    TextCache.clear()
+
+    TextCache.text_clip("a", font, 20)
+    TextCache.text_clip("b", font, 20)
+    TextCache.text_clip("a", font, 20)
+    TextCache.text_clip("c", font, 20)
+
+    TextCache.text_clip("a", font, 20)
+    TextCache.text_clip("b", font, 20)
+
+    assert rasterized == ["a", "b", "c", "b"]
+
+
+def test_disk_tier_is_shared_across_memory_caches(font, rasterized, tmp_path):
+    TextCache.configure(disk_dir= str(tmp_path), backend= "pillow")
+    first = TextCache.text_clip("Caption", font, 20)
+    TextCache.clear()
+    second = TextCache.text_clip("Caption", font, 20)
+
+    assert rasterized == ["Caption"]
+    assert np.array_equal(second.img, first.img)
+    assert [name for name in os.listdir(tmp_path) if not name.endswith(".npz")] == []
+
+
+def test_unknown_font_raises():
+    with pytest.raises(ValueError, match= "No Such Font"):
+        TextCache.text_clip("Caption", "No Such Font", 20)